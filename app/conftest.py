@@ -0,0 +1,17 @@
+"""
+Pytest root for the application package
+
+Lives next to core/ and modules/ so pytest puts this directory on sys.path
+and tests import the code the same way the app does (``from core...``).
+"""
+import os
+
+# Обязательные настройки для core.config; тесты не ходят в БД
+os.environ.setdefault("SECRET_KEY", "Xq7vN2pL9rT4wY8zK3mB6cF1hJ5dG0sA")
+os.environ.setdefault("POSTGRES_HOST", "localhost")
+os.environ.setdefault("POSTGRES_PORT", "5432")
+os.environ.setdefault("POSTGRES_DB", "employee_cabinet_test")
+os.environ.setdefault("POSTGRES_USER", "postgres")
+os.environ.setdefault("POSTGRES_PASSWORD", "postgres")
+os.environ.setdefault("SWAGGER_USERNAME", "swagger")
+os.environ.setdefault("SWAGGER_PASSWORD", "swagger")
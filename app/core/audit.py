@@ -5,18 +5,213 @@
 for security and compliance purposes.
 """
 
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
-import json
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 # Audit log file location
 AUDIT_LOG_DIR = Path("/app/logs")
 AUDIT_LOG_FILE = AUDIT_LOG_DIR / "audit.log"
 
+# orjson serializes datetime natively, e.g. "2024-01-01T12:00:00Z",
+# and terminates each entry with "\n" itself. Non-str dict keys and
+# otherwise unsupported values are stringified, as json.dumps callers expect
+_ORJSON_OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC | orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+)
+
+
+@dataclass(slots=True)
+class AuditEntry:
+    """
+    Single audit log record.
+
+    orjson serializes slotted dataclasses natively, so the on-disk format
+    stays one JSON object per line with these fields in this order.
+    """
+    timestamp: datetime
+    user_id: Optional[int]
+    action: str
+    table_name: str
+    record_id: Optional[int]
+    ip_address: Optional[str]
+    changes: Optional[Dict[str, Any]]
+    additional_info: Optional[Dict[str, Any]]
+
+
+# (millisecond, datetime) of the last timestamp: bursts of audit events within
+# the same millisecond share one datetime object
+_ts_cache: Tuple[int, Optional[datetime]] = (-1, None)
+
+# Entries are handed to a single writer thread so callers never touch the disk
+_AUDIT_QUEUE_MAX_SIZE = 10000
+# Stays well below IOV_MAX (1024 on Linux) for os.writev
+_AUDIT_BATCH_SIZE = 256
+
+_audit_queue: "queue.Queue[AuditEntry]" = queue.Queue(maxsize=_AUDIT_QUEUE_MAX_SIZE)
+_writer_thread: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+
+# The audit file is opened once and reused; O_APPEND keeps each write atomic
+_AUDIT_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC
+_audit_fd: Optional[int] = None
+_fd_lock = threading.Lock()
+
+try:
+    AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+except OSError:
+    # Handled on open: entries go to the fallback file
+    pass
+
+
+def _utc_now() -> datetime:
+    """Current UTC time with millisecond precision, cached per millisecond."""
+    global _ts_cache
+
+    ms = time.time_ns() // 1_000_000
+    cached_ms, cached_dt = _ts_cache
+    if ms == cached_ms:
+        return cached_dt
+
+    seconds, millis = divmod(ms, 1000)
+    dt = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=millis * 1000)
+    _ts_cache = (ms, dt)
+    return dt
+
+
+def _get_audit_fd() -> int:
+    """Return the cached audit file descriptor, opening it on first use."""
+    global _audit_fd
+
+    if _audit_fd is None:
+        try:
+            _audit_fd = os.open(AUDIT_LOG_FILE, _AUDIT_OPEN_FLAGS, 0o640)
+        except OSError:
+            # If /app/logs is not writable or could not be created at import,
+            # fall back to local directory
+            fallback_log = Path("./audit.log")
+            _audit_fd = os.open(fallback_log, _AUDIT_OPEN_FLAGS, 0o640)
+            logger.warning(f"Could not write to {AUDIT_LOG_FILE}, using {fallback_log}")
+    return _audit_fd
+
+
+def close_audit_log() -> None:
+    """Close the cached audit file descriptor."""
+    global _audit_fd
+
+    with _fd_lock:
+        fd, _audit_fd = _audit_fd, None
+        if fd is not None:
+            os.close(fd)
+
+
+def reopen_audit_log() -> None:
+    """
+    Reopen the audit file on the next write.
+
+    Call after external log rotation (logrotate, SIGHUP handler) has moved
+    the current file away.
+    """
+    close_audit_log()
+
+
+def _write_entries(entries: List[AuditEntry]) -> None:
+    """Serialize a batch of audit entries and append them to the audit file."""
+    chunks = []
+    for entry in entries:
+        # One entry that cannot be encoded must not drop the rest of the batch
+        try:
+            chunks.append(orjson.dumps(entry, default=str, option=_ORJSON_OPTIONS))
+        except TypeError as e:
+            logger.error(
+                f"Failed to serialize audit entry {entry.action} on {entry.table_name}: {e}"
+            )
+    if not chunks:
+        return
+    total = sum(len(chunk) for chunk in chunks)
+
+    with _fd_lock:
+        fd = _get_audit_fd()
+        # One vectored syscall per batch, without joining the buffers
+        written = os.writev(fd, chunks)
+        if written < total:
+            rest = memoryview(b"".join(chunks))[written:]
+            while rest:
+                rest = rest[os.write(fd, rest):]
+
+
+def _audit_writer() -> None:
+    """Drain the audit queue, coalescing pending entries into one write."""
+    while True:
+        batch = [_audit_queue.get()]
+        while len(batch) < _AUDIT_BATCH_SIZE:
+            try:
+                batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            _write_entries(batch)
+        except Exception as e:
+            # Always log audit failures - this is critical for security
+            logger.error(f"Failed to write audit log: {e}", exc_info=True)
+
+
+def _ensure_writer() -> None:
+    """Start the writer thread on first use (after any worker fork)."""
+    global _writer_thread
+
+    if _writer_thread is not None and _writer_thread.is_alive():
+        return
+
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(
+                target=_audit_writer, name="audit-writer", daemon=True
+            )
+            _writer_thread.start()
+
+
+def _enqueue_entry(audit_entry: AuditEntry) -> None:
+    """Queue an entry for the writer thread; write inline if the queue is full."""
+    _ensure_writer()
+    try:
+        _audit_queue.put_nowait(audit_entry)
+    except queue.Full:
+        _write_entries([audit_entry])
+
+
+def flush_audit_log() -> None:
+    """Write out entries still waiting in the queue (used at interpreter exit)."""
+    pending = []
+    while True:
+        try:
+            pending.append(_audit_queue.get_nowait())
+        except queue.Empty:
+            break
+
+    if pending:
+        try:
+            _write_entries(pending)
+        except Exception as e:
+            logger.error(f"Failed to flush audit log: {e}", exc_info=True)
+
+
+# atexit runs handlers in reverse order: flush first, then close
+atexit.register(close_audit_log)
+atexit.register(flush_audit_log)
+
 
 async def log_audit_event(
     user_id: Optional[int],
@@ -49,44 +244,17 @@ async def log_audit_event(
         ...     ip_address="192.168.1.100"
         ... )
     """
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    audit_entry = {
-        "timestamp": timestamp,
-        "user_id": user_id,
-        "action": action,
-        "table_name": table_name,
-        "record_id": record_id,
-        "ip_address": ip_address,
-        "changes": changes,
-        "additional_info": additional_info
-    }
-    
-    try:
-        # Create audit log directory if it doesn't exist
-        AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
-        
-        # Write to audit log file
-        with open(AUDIT_LOG_FILE, "a") as f:
-            f.write(json.dumps(audit_entry) + "\n")
-        
-        # Also log to application logger for immediate visibility
-        logger.info(
-            f"AUDIT: {action} on {table_name}"
-            f"{f' (record_id={record_id})' if record_id else ''} "
-            f"by user_id={user_id} from {ip_address}"
-        )
-        
-    except PermissionError:
-        # If we can't write to /var/log, fall back to local directory
-        fallback_log = Path("./audit.log")
-        with open(fallback_log, "a") as f:
-            f.write(json.dumps(audit_entry) + "\n")
-        logger.warning(f"Could not write to {AUDIT_LOG_FILE}, using {fallback_log}")
-        
-    except Exception as e:
-        # Always log audit failures - this is critical for security
-        logger.error(f"Failed to write audit log: {e}", exc_info=True)
+    # Enqueueing never blocks, so the shared implementation is safe to call
+    # directly from the event loop
+    log_audit_event_sync(
+        user_id=user_id,
+        action=action,
+        table_name=table_name,
+        record_id=record_id,
+        changes=changes,
+        ip_address=ip_address,
+        additional_info=additional_info,
+    )
 
 
 def log_audit_event_sync(
@@ -104,42 +272,34 @@ def log_audit_event_sync(
     Args:
         Same as log_audit_event
     """
-    timestamp = datetime.now(timezone.utc).isoformat()
-    
-    audit_entry = {
-        "timestamp": timestamp,
-        "user_id": user_id,
-        "action": action,
-        "table_name": table_name,
-        "record_id": record_id,
-        "ip_address": ip_address,
-        "changes": changes,
-        "additional_info": additional_info
-    }
+    audit_entry = AuditEntry(
+        timestamp=_utc_now(),
+        user_id=user_id,
+        action=action,
+        table_name=table_name,
+        record_id=record_id,
+        ip_address=ip_address,
+        changes=changes,
+        additional_info=additional_info,
+    )
     
     try:
-        # Create audit log directory if it doesn't exist
-        AUDIT_LOG_DIR.mkdir(parents=True, exist_ok=True)
+        # Hand off to the writer thread - no file I/O on the caller's thread
+        _enqueue_entry(audit_entry)
         
-        # Write to audit log file
-        with open(AUDIT_LOG_FILE, "a") as f:
-            f.write(json.dumps(audit_entry) + "\n")
-        
-        # Also log to application logger
-        logger.info(
-            f"AUDIT: {action} on {table_name}"
-            f"{f' (record_id={record_id})' if record_id else ''} "
-            f"by user_id={user_id} from {ip_address}"
-        )
-        
-    except PermissionError:
-        # If we can't write to /var/log, fall back to local directory
-        fallback_log = Path("./audit.log")
-        with open(fallback_log, "a") as f:
-            f.write(json.dumps(audit_entry) + "\n")
-        logger.warning(f"Could not write to {AUDIT_LOG_FILE}, using {fallback_log}")
+        # Also log to application logger for immediate visibility
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "AUDIT: %s on %s%s by user_id=%s from %s",
+                action,
+                table_name,
+                f" (record_id={record_id})" if record_id else "",
+                user_id,
+                ip_address,
+            )
         
     except Exception as e:
+        # Always log audit failures - this is critical for security
         logger.error(f"Failed to write audit log: {e}", exc_info=True)
 
 
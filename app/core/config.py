@@ -6,14 +6,18 @@
 Этот модуль позволяет легко настраивать приложение через переменные окружения
 и обеспечивает единый источник правды для всех конфигурационных параметров.
 """
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from datetime import timezone, timedelta, datetime
+from functools import cache
 from pydantic import Field, field_validator, ValidationInfo
-from typing import Optional
+from typing import Literal, Optional, TYPE_CHECKING
 import warnings
 import logging
+import re
 from urllib.parse import quote_plus
 
+import orjson
+
 import os
 from zoneinfo import ZoneInfo
 
@@ -21,6 +25,9 @@
 
 logger = logging.getLogger(__name__)
 
+# Типичные слабые фрагменты SECRET_KEY (одна проверка вместо цикла по списку)
+_WEAK_KEY_RE = re.compile(r"change|secret|password|default|test|123", re.IGNORECASE)
+
 # ===================================
 #  Настройки временной зоны
 # ===================================
@@ -82,6 +89,27 @@ def format_timestamp(dt: Optional[datetime] = None, format: str = "iso") -> str:
         return dt.isoformat()
 
 
+def _parse_str_list(value: str, field_name: str, default: List[str]) -> List[str]:
+    """
+    Разбирает список строк из переменной окружения.
+
+    Обычно это простая строка через запятую ("a, b") — она разбирается без
+    JSON-парсера; JSON-массив ('["a", "b"]') разбирается через orjson.
+    """
+    s = value.strip()
+    if not s:
+        return default
+
+    if s[0] != "[":
+        return [item.strip() for item in s.split(",") if item.strip()]
+
+    try:
+        return orjson.loads(s)
+    except orjson.JSONDecodeError:
+        logger.warning(f"Failed to parse {field_name} as JSON: {value}, using default")
+        return default
+
+
 class Settings(BaseSettings):
     APP_NAME: str = "Employee Cabinet"
     DEBUG: bool = True
@@ -99,6 +127,7 @@ class Settings(BaseSettings):
     redis_host: str = "redis"
     redis_port: int = 6379
     REDIS_URL: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 32  # размер пула async-клиента
 
     # Files
     FILES_PATH: str = "/app/files"
@@ -144,6 +173,8 @@ class Settings(BaseSettings):
     TELEGRAM_CHAT_ID: Optional[str] = None
     LOG_RETENTION_DAYS: int = 30
     ALERT_RETENTION_HOURS: int = 24
+    # Алерты ниже этого уровня не создаются (low / medium / high / critical)
+    ALERT_MIN_SEVERITY: Literal["low", "medium", "high", "critical"] = "low"
     BRUTE_FORCE_THRESHOLD: int = 5
     BRUTE_FORCE_WINDOW_MINUTES: int = 5
 
@@ -169,11 +200,16 @@ class Settings(BaseSettings):
      # Environment
     ENVIRONMENT: str = "development"  # development, staging, production
 
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=True,
         # Allow JSON parsing errors to be caught by validators
-        env_parse_none_str = 'empty'
+        env_parse_none_str='empty',
+        # Настройки неизменяемы после загрузки
+        frozen=True,
+        # Лишние переменные в .env (например, REDIS_HOST) не ломают запуск
+        extra="ignore",
+    )
 
     @field_validator('SECRET_KEY')
     @classmethod
@@ -186,8 +222,7 @@ def validate_secret_key(cls, v: str, info: ValidationInfo) -> str:
             )
 
         # Warn if using default/weak patterns
-        weak_patterns = ['change', 'secret', 'password', 'default', 'test', '123']
-        if any(pattern in v.lower() for pattern in weak_patterns):
+        if _WEAK_KEY_RE.search(v):
             warnings.warn(
                 (
                     "SECRET_KEY appears to contain weak patterns. "
@@ -257,27 +292,17 @@ def build_redis_url(cls, v: Optional[str], info: ValidationInfo) -> str:
     @field_validator('DOCS_ALLOWED_IPS', mode='before')
     @classmethod
     def parse_docs_ips(cls, v):
-        """Parse DOCS_ALLOWED_IPS from JSON string or list"""
+        """Parse DOCS_ALLOWED_IPS from JSON string, comma-separated string or list"""
         if isinstance(v, str):
-            import json
-            try:
-                return json.loads(v)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse DOCS_ALLOWED_IPS as JSON: {v}, using default")
-                return ["127.0.0.1"]
+            return _parse_str_list(v, "DOCS_ALLOWED_IPS", ["127.0.0.1"])
         return v if v else ["127.0.0.1"]
 
     @field_validator('ALERT_EMAIL_RECIPIENTS', mode='before')
     @classmethod
     def parse_alert_recipients(cls, v):
-        """Parse ALERT_EMAIL_RECIPIENTS from JSON string or list"""
+        """Parse ALERT_EMAIL_RECIPIENTS from JSON string, comma-separated string or list"""
         if isinstance(v, str):
-            import json
-            try:
-                return json.loads(v)
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse ALERT_EMAIL_RECIPIENTS as JSON: {v}, using empty list")
-                return []
+            return _parse_str_list(v, "ALERT_EMAIL_RECIPIENTS", [])
         return v if v else []
 
     @field_validator("SERVER_HOST", mode="before")
@@ -299,9 +324,35 @@ def set_server_host(cls, v, info: ValidationInfo):
 
         return "127.0.0.1"
 
-settings = Settings()
+@cache
+def get_settings() -> Settings:
+    """Единственный экземпляр настроек, создаётся при первом обращении"""
+    return Settings()
+
+
+if TYPE_CHECKING:
+    settings: Settings
+
+
+def __getattr__(name: str):
+    # PEP 562: `settings` создаётся лениво — импорт модуля ради констант
+    # (временная зона, format_timestamp) не запускает разбор окружения
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Вычисляемые константы
-JWT_EXPIRATION_DELTA = timedelta(seconds=settings.JWT_EXPIRATION_SECONDS)
-REFRESH_TOKEN_EXPIRATION_DELTA = timedelta(days=settings.REFRESH_TOKEN_EXPIRATION_DAYS)
-OTP_EXPIRATION_DELTA = timedelta(seconds=settings.OTP_EXPIRATION_SECONDS)
\ No newline at end of file
+@cache
+def jwt_expiration_delta() -> timedelta:
+    return timedelta(seconds=get_settings().JWT_EXPIRATION_SECONDS)
+
+
+@cache
+def refresh_token_expiration_delta() -> timedelta:
+    return timedelta(days=get_settings().REFRESH_TOKEN_EXPIRATION_DAYS)
+
+
+@cache
+def otp_expiration_delta() -> timedelta:
+    return timedelta(seconds=get_settings().OTP_EXPIRATION_SECONDS)
@@ -3,8 +3,10 @@
 Единый справочник констант для всего проекта
 """
 
+import sys
 from enum import Enum
-from typing import Optional, Dict, Any
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping
 
 
 # ===================================
@@ -23,7 +25,7 @@ class UserRole(str, Enum):
     @classmethod
     def has_role(cls, role: str) -> bool:
         """Проверка существования роли"""
-        return role in cls._value2member_map_
+        return role in _ROLE_VALUES
 
 
 # ===================================
@@ -41,12 +43,12 @@ class DocumentCategory(str, Enum):
     @property
     def emoji(self) -> str:
         """Эмодзи для категории"""
-        return CATEGORY_DISPLAY.get(self.value, {}).get("emoji", "📄")
+        return _CATEGORY_EMOJI[self]
 
     @property
     def display_name(self) -> str:
         """Отображаемое название"""
-        return CATEGORY_DISPLAY.get(self.value, {}).get("name", self.value.capitalize())
+        return _CATEGORY_NAME[self]
 
 
 # ===================================
@@ -103,18 +105,26 @@ class DepartmentName(str, Enum):
 # Отображение для UI
 # ===================================
 
+def _freeze_display(raw: Dict[str, Dict[str, str]]) -> Mapping[str, Mapping[str, str]]:
+    """Неизменяемая копия справочника отображения с интернированными строками"""
+    return MappingProxyType({
+        key: MappingProxyType({k: sys.intern(v) for k, v in info.items()})
+        for key, info in raw.items()
+    })
+
+
 # Информация для отображения категорий
-CATEGORY_DISPLAY: Dict[str, Dict[str, str]] = {
+CATEGORY_DISPLAY: Mapping[str, Mapping[str, str]] = _freeze_display({
     "general": {"emoji": "📋", "name": "Общие"},
     "technical": {"emoji": "📐", "name": "Технические"},
     "accounting": {"emoji": "💰", "name": "Бухгалтерия"},
     "safety": {"emoji": "👷", "name": "Охрана труда"},
     "legal": {"emoji": "⚖️", "name": "Юридические"},
     "hr": {"emoji": "👔", "name": "Кадровые"},
-}
+})
 
 # Информация для отображения ролей
-ROLE_DISPLAY: Dict[str, Dict[str, str]] = {
+ROLE_DISPLAY: Mapping[str, Mapping[str, str]] = _freeze_display({
     "admin": {"emoji": "👑", "name": "Администратор"},
     "accountant": {"emoji": "💰", "name": "Бухгалтер"},
     "hr": {"emoji": "👔", "name": "HR-специалист"},
@@ -122,6 +132,25 @@ class DepartmentName(str, Enum):
     "lawyer": {"emoji": "⚖️", "name": "Юрист"},
     "safety": {"emoji": "👷", "name": "Специалист по охране труда"},
     "employee": {"emoji": "👤", "name": "Сотрудник"},
+})
+
+# Предвычисленные значения для свойств enum (один поиск в dict на вызов)
+_ROLE_VALUES = frozenset(r.value for r in UserRole)
+
+_CATEGORY_EMOJI: Dict[DocumentCategory, str] = {
+    c: CATEGORY_DISPLAY.get(c.value, {}).get("emoji", "📄") for c in DocumentCategory
+}
+_CATEGORY_NAME: Dict[DocumentCategory, str] = {
+    c: CATEGORY_DISPLAY.get(c.value, {}).get("name", c.value.capitalize())
+    for c in DocumentCategory
+}
+
+# Строковые варианты маппингов для горячих путей авторизации
+_ROLE_TO_DEPT_STR: Dict[UserRole, Optional[str]] = {
+    r: (d.value if d else None) for r, d in ROLE_TO_DEPARTMENT.items()
+}
+_DEPT_STR_TO_CATEGORY: Dict[str, DocumentCategory] = {
+    d.value: c for d, c in DEPARTMENT_TO_CATEGORY.items()
 }
 
 
@@ -133,29 +162,24 @@ def get_department_for_role(role: UserRole) -> Optional[str]:
     """
     Получить название отдела для роли
     """
-    dept = ROLE_TO_DEPARTMENT.get(role)
-    return dept.value if dept else None
+    return _ROLE_TO_DEPT_STR.get(role)
 
 
 def get_category_for_department(dept_name: str) -> Optional[DocumentCategory]:
     """
     Получить категорию документа по названию отдела
     """
-    try:
-        dept = DepartmentName(dept_name)
-        return DEPARTMENT_TO_CATEGORY.get(dept)
-    except ValueError:
-        return None
+    return _DEPT_STR_TO_CATEGORY.get(dept_name)
 
 
-def get_role_display(role: str) -> Dict[str, str]:
+def get_role_display(role: str) -> Mapping[str, str]:
     """
     Получить отображаемые данные для роли
     """
     return ROLE_DISPLAY.get(role, {"emoji": "❓", "name": role})
 
 
-def get_category_display(category: str) -> Dict[str, str]:
+def get_category_display(category: str) -> Mapping[str, str]:
     """
     Получить отображаемые данные для категории
     """
@@ -10,6 +10,7 @@
 """
 import logging
 
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
@@ -23,18 +24,35 @@ class Base(DeclarativeBase):
     """Базовый класс для всех моделей SQLAlchemy."""
 
 
+def _json_serializer(value) -> str:
+    """Сериализация JSON/JSONB колонок через orjson (extra_data логов, details алертов).
+
+    OPT_NON_STR_KEYS сохраняет поведение json.dumps для словарей с нестроковыми ключами.
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_size=10,  # Постоянно 10 соединений
     max_overflow=20,  # Дополнительно до 20 соединений при пиковых нагрузках
     pool_timeout=5,  # Не ждём соединение слишком долго под нагрузкой
+    pool_use_lifo=True,  # Переиспользуем «горячие» соединения, лишние простаивают и закрываются
     future=True,
-    pool_pre_ping=True,  # Проверка соединений перед использованием
+    # SELECT 1 перед каждой выдачей соединения — лишний round-trip на запрос.
+    # В production мёртвые соединения отсекают TCP keepalive и pool_recycle.
+    pool_pre_ping=settings.ENVIRONMENT != "production",
     pool_recycle=3600,  # Обновление соединений каждые 3600 секунд (1 час).
     pool_reset_on_return="rollback",
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
     connect_args={
         "connect_timeout": 5,
         "application_name": "employee_cabinet",
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
         "options": (
             "-c statement_timeout=15000 "
             "-c lock_timeout=5000 "
@@ -1,20 +1,69 @@
+import csv
+import io
 import logging
+import queue
+import sys
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 
-from sqlalchemy import text
+import orjson
+import psycopg2
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from core.database import SessionLocal
 from core.request_id_middleware import get_request_id
+from modules.admin.models import AuditLog, LogLevel, UserAgentCache
 
 
 class DatabaseLogHandler(logging.Handler):
     """
     Обработчик логов для записи в базу данных
+
+    emit() только собирает строку и кладёт её в очередь; фоновый поток
+    забирает накопившиеся записи пачкой и пишет их одной транзакцией.
     """
 
+    # Очередь и групповая запись: одна транзакция (один commit/fsync) на эпоху —
+    # каждые 200 мс или 500 записей, что наступит раньше
+    QUEUE_MAX_SIZE = 10000
+    EPOCH_MAX_RECORDS = 500
+    EPOCH_INTERVAL_SEC = 0.2
+
+    # In-process кеш user_agent -> id: повторяющиеся UA не ходят в БД
+    UA_CACHE_MAX_SIZE = 4096
+
+    # Колонки audit_logs, которые заполняет обработчик. executemany требует
+    # одинаковый набор ключей в каждой строке, поэтому None не выкидываем.
+    _COLUMNS = (
+        "request_id",
+        "trace_id",
+        "level",
+        "event",
+        "message",
+        "extra_data",
+        "user_id",
+        "user_email",
+        "ip_address",
+        "user_agent_id",
+        "http_method",
+        "http_path",
+        "http_status",
+        "duration_ms",
+        "expires_at",
+        "created_at",
+    )
+
+    # Пачки больше порога (догон очереди, flush при остановке) пишем через COPY:
+    # без разбора и планирования INSERT на каждую строку
+    COPY_THRESHOLD = 500
+    _COPY_SQL = f"COPY audit_logs ({', '.join(_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
     # ✅ TTL для разных уровней логов
     TTL_DAYS = {
         "DEBUG": 7,  # 7 дней
@@ -23,11 +72,34 @@ class DatabaseLogHandler(logging.Handler):
         "ERROR": 180,  # 6 месяцев
         "CRITICAL": 365,  # 1 год
     }
+    _TTL = {level: timedelta(days=days) for level, days in TTL_DAYS.items()}
+    _DEFAULT_TTL = timedelta(days=30)
+
+    # Ключи record.msg, которые уходят в отдельные колонки, а не в extra_data
+    _EXCLUDES = frozenset({
+        "event",
+        "message",
+        "user_id",
+        "email",
+        "ip",
+        "user_agent",
+        "method",
+        "path",
+        "status",
+        "duration_ms",
+        "request_id",
+        "trace_id",
+    })
 
     def __init__(self):
         super().__init__()
         self._disabled_until = 0.0
         self._failure_cooldown_sec = 60
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=self.QUEUE_MAX_SIZE)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+        self._ua_ids: "OrderedDict[str, int]" = OrderedDict()
+        self._ua_lock = threading.Lock()
 
     @staticmethod
     def _is_safe_user_id(value):
@@ -56,26 +128,8 @@ def _parse_record_payload(self, record) -> dict:
         http_status_raw = msg.get("status")
         http_status = http_status_raw if isinstance(http_status_raw, int) else None
 
-        excluded_keys = {
-            "event",
-            "message",
-            "user_id",
-            "email",
-            "ip",
-            "user_agent",
-            "method",
-            "path",
-            "status",
-            "duration_ms",
-            "request_id",
-            "trace_id",
-        }
-
-        extra_data = {
-            k: v
-            for k, v in msg.items()
-            if k not in excluded_keys and not (k == "status" and isinstance(v, int))
-        }
+        excluded = self._EXCLUDES
+        extra_data = {k: v for k, v in msg.items() if k not in excluded}
 
         return {
             "event": msg.get("event", "unknown"),
@@ -92,105 +146,255 @@ def _parse_record_payload(self, record) -> dict:
             "extra_data": extra_data,
         }
 
-    @staticmethod
-    def _expires_at(level_name: str) -> datetime:
-        ttl_days = DatabaseLogHandler.TTL_DAYS.get(level_name, 30)
-        return datetime.now(timezone.utc) + timedelta(days=ttl_days)
+    @classmethod
+    def _expires_at(cls, level_name: str, created_at: datetime) -> datetime:
+        return created_at + cls._TTL.get(level_name, cls._DEFAULT_TTL)
 
     def emit(self, record):
-        """Записываем лог в БД"""
+        """Ставим лог в очередь на запись в БД"""
         if time.monotonic() < self._disabled_until:
             return
 
         try:
-            from modules.admin.models import AuditLog, LogLevel
+            # request_id берём здесь: contextvar доступен только в потоке запроса
+            payload = self._parse_record_payload(record)
+            created_at = datetime.fromtimestamp(record.created, tz=timezone.utc)
+            row = {
+                "request_id": get_request_id(),
+                "trace_id": payload["trace_id"],
+                "level": LogLevel[record.levelname],
+                "event": payload["event"],
+                "message": payload["message"],
+                "extra_data": payload["extra_data"],
+                "user_id": payload["user_id"],
+                "user_email": payload["user_email"],
+                "ip_address": payload["ip_address"],
+                "user_agent_str": payload["user_agent_str"],
+                "http_method": payload["http_method"],
+                "http_path": payload["http_path"],
+                "http_status": payload["http_status"],
+                "duration_ms": payload["duration_ms"],
+                "expires_at": self._expires_at(record.levelname, created_at),
+                # Время события, а не момент пакетной вставки
+                "created_at": created_at,
+            }
+        except (ValueError, TypeError, KeyError) as e:
+            print(f"Ошибка в DatabaseLogHandler: {e}", file=sys.stderr)
+            return
 
-            db: Session = SessionLocal()
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Переполнение: вытесняем самую старую запись
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                pass
 
+    def flush(self):
+        """Синхронно дописываем всё, что осталось в очереди (logging.shutdown)"""
+        batch = []
+        while True:
             try:
-                # Fail-fast для проблемных соединений/долгих запросов в логгер.
-                db.execute(text("SET LOCAL statement_timeout = '2000ms'"))
-
-                # ✅ Получаем request_id из context
-                request_id = get_request_id()
-                payload = self._parse_record_payload(record)
-
-                # ✅ Получаем или создаём User-Agent
-                user_agent_id = None
-                if payload["user_agent_str"]:
-                    user_agent_id = self._get_or_create_user_agent(
-                        db,
-                        payload["user_agent_str"],
-                    )
-
-                # Создаём запись лога
-                log_entry = AuditLog(
-                    request_id=request_id,
-                    trace_id=payload["trace_id"],
-                    level=LogLevel[record.levelname],
-                    event=payload["event"],
-                    message=payload["message"],
-                    extra_data=payload["extra_data"],
-                    user_id=payload["user_id"],
-                    user_email=payload["user_email"],
-                    ip_address=payload["ip_address"],
-                    user_agent_id=user_agent_id,
-                    http_method=payload["http_method"],
-                    http_path=payload["http_path"],
-                    http_status=payload["http_status"],
-                    duration_ms=payload["duration_ms"],
-                    expires_at=self._expires_at(record.levelname),
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.QUEUE_MAX_SIZE:
+                self._write_batch(batch)
+                batch = []
+        if batch:
+            self._write_batch(batch)
+
+    def _ensure_worker(self):
+        """Запускаем фоновый поток при первой записи (в т.ч. после fork воркера)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._drain, name="db-log-writer", daemon=True
                 )
+                self._worker.start()
+
+    def _drain(self):
+        """Эпоха начинается с первой записи и закрывается по таймеру или по объёму"""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.EPOCH_INTERVAL_SEC
 
-                db.add(log_entry)
-                db.commit()
-            except (
-                SQLAlchemyError,
-                ValueError,
-                TypeError,
-                KeyError,
-                IndexError,
-            ) as e:
-                import sys
-
-                print(f"Ошибка записи в базу данных: {e}", file=sys.stderr)
+            while len(batch) < self.EPOCH_MAX_RECORDS:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
                 try:
-                    db.rollback()
-                except SQLAlchemyError:
-                    pass
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Поток записи не должен умирать: иначе логи в БД не пишутся до рестарта
+                print(f"Ошибка фоновой записи логов в БД: {e}", file=sys.stderr)
                 self._disabled_until = time.monotonic() + self._failure_cooldown_sec
-            finally:
-                try:
-                    db.close()
-                except SQLAlchemyError:
-                    pass
 
-        except (ImportError, SQLAlchemyError, ValueError, TypeError) as e:
-            print(f"Ошибка в DatabaseLogHandler: {e}")
+    def _write_batch(self, batch: list):
+        """Записываем пачку логов в БД одной транзакцией"""
+        if time.monotonic() < self._disabled_until:
+            return
+
+        db: Session = SessionLocal()
 
-    def _get_or_create_user_agent(
+        try:
+            # Fail-fast для проблемных соединений/долгих запросов в логгер.
+            db.execute(text("SET LOCAL statement_timeout = '2000ms'"))
+
+            # ✅ Получаем или создаём User-Agent — сразу для всей пачки
+            for row in batch:
+                # Ограничиваем длину до 1000 символов
+                if row["user_agent_str"]:
+                    row["user_agent_str"] = row["user_agent_str"][:1000]
+
+            ua_ids, new_ua_ids = self._resolve_user_agent_ids(
+                db, [row["user_agent_str"] for row in batch if row["user_agent_str"]]
+            )
+            for row in batch:
+                user_agent_str = row.pop("user_agent_str")
+                row["user_agent_id"] = ua_ids.get(user_agent_str) if user_agent_str else None
+
+            if len(batch) > self.COPY_THRESHOLD:
+                self._copy_rows(db, batch)
+            else:
+                # Core executemany без unit of work: строки после вставки не читаем
+                columns = self._COLUMNS
+                db.execute(
+                    insert(AuditLog.__table__),
+                    [{column: row[column] for column in columns} for row in batch],
+                )
+            db.commit()
+            # В кеш — только после commit, чтобы не запомнить откатанные id
+            self._remember_user_agents(new_ua_ids)
+        except (
+            SQLAlchemyError,
+            # COPY идёт через курсор psycopg2 напрямую, его ошибки не обёрнуты SQLAlchemy
+            psycopg2.Error,
+            ValueError,
+            TypeError,
+            KeyError,
+            IndexError,
+        ) as e:
+            print(f"Ошибка записи в базу данных: {e}", file=sys.stderr)
+            try:
+                db.rollback()
+            except SQLAlchemyError:
+                pass
+            self._disabled_until = time.monotonic() + self._failure_cooldown_sec
+        finally:
+            try:
+                db.close()
+            except SQLAlchemyError:
+                pass
+
+    def _copy_rows(self, db: Session, batch: list):
+        """Записать пачку через COPY ... FROM STDIN в транзакции сессии"""
+        buffer = io.StringIO()
+        # QUOTE_NOTNULL: None -> пустое поле без кавычек (NULL), "" -> пустая строка
+        writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+        for row in batch:
+            writer.writerow([self._copy_value(row[column]) for column in self._COLUMNS])
+        buffer.seek(0)
+
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(self._COPY_SQL, buffer)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _copy_value(value):
+        """Значение колонки в текстовом виде для COPY"""
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, LogLevel):
+            return value.value
+        if isinstance(value, (dict, list)):
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        return value
+
+    def _resolve_user_agent_ids(
         self,
         db: Session,
-        user_agent_str: str,
-    ) -> int:
-        """Получить или создать User-Agent в кеше"""
-        from modules.admin.models import UserAgentCache
-
-        # Ограничиваем длину до 1000 символов
-        user_agent_str = user_agent_str[:1000]
-
-        # Ищем существующий
-        ua = (
-            db.query(UserAgentCache)
-            .filter(UserAgentCache.user_agent == user_agent_str)
-            .first()
+        user_agents: list,
+    ) -> tuple:
+        """
+        id всех User-Agent пачки: LRU-кеш, затем один SELECT по промахам
+        и один upsert для новых строк. Возвращает (все id, id не из кеша).
+        """
+        ua_ids: dict = {}
+        missing = set()
+
+        with self._ua_lock:
+            for user_agent_str in user_agents:
+                ua_id = self._ua_ids.get(user_agent_str)
+                if ua_id is None:
+                    missing.add(user_agent_str)
+                else:
+                    self._ua_ids.move_to_end(user_agent_str)
+                    ua_ids[user_agent_str] = ua_id
+
+        if not missing:
+            return ua_ids, {}
+
+        table = UserAgentCache.__table__
+        new_ua_ids = dict(
+            db.execute(
+                select(table.c.user_agent, table.c.id).where(
+                    table.c.user_agent.in_(missing)
+                )
+            ).all()
         )
 
-        if ua:
-            # Не коммитим здесь отдельно: минимизируем транзакции в emit().
-            return ua.id
+        to_create = missing.difference(new_ua_ids)
+        if to_create:
+            new_ua_ids.update(self._create_user_agents(db, to_create))
+
+        ua_ids.update(new_ua_ids)
+        return ua_ids, new_ua_ids
 
-        new_ua = UserAgentCache(user_agent=user_agent_str)
-        db.add(new_ua)
-        db.flush()
-        return new_ua.id
+    def _remember_user_agents(self, new_ua_ids: dict):
+        """Кладём закоммиченные UA в LRU-кеш"""
+        if not new_ua_ids:
+            return
+
+        with self._ua_lock:
+            self._ua_ids.update(new_ua_ids)
+            while len(self._ua_ids) > self.UA_CACHE_MAX_SIZE:
+                self._ua_ids.popitem(last=False)
+
+    def _create_user_agents(
+        self,
+        db: Session,
+        user_agents: set,
+    ) -> dict:
+        """Создать User-Agent одним upsert (параллельная вставка того же UA не падает)"""
+        table = UserAgentCache.__table__
+        stmt = (
+            pg_insert(table)
+            .values([{"user_agent": user_agent_str} for user_agent_str in user_agents])
+            .on_conflict_do_update(
+                index_elements=[table.c.user_agent],
+                set_={
+                    "usage_count": table.c.usage_count + 1,
+                    "last_seen": func.now(),
+                },
+            )
+            .returning(table.c.user_agent, table.c.id)
+        )
+        # Не коммитим здесь отдельно: запись идёт в транзакции пачки.
+        return dict(db.execute(stmt).all())
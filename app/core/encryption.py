@@ -2,18 +2,34 @@
 Encryption utilities for sensitive data protection.
 
 This module provides functions for encrypting and decrypting sensitive data
-using Fernet symmetric encryption (AES-128 in CBC mode).
+using AES-256-GCM. Values encrypted earlier with Fernet (AES-128 in CBC mode
++ HMAC-SHA256) remain decryptable.
 """
 
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet, InvalidToken
-from base64 import urlsafe_b64encode
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import lru_cache
 import hashlib
+import os
 import logging
 from typing import Optional
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Version tag of AES-GCM tokens: "v1:" + urlsafe_b64(nonce + ciphertext + tag).
+# Fernet tokens are plain urlsafe base64 and never contain ":".
+_AESGCM_PREFIX = "v1:"
+_NONCE_SIZE = 12
+
+# Shortest possible tokens: AES-GCM = prefix + b64(12-byte nonce + 16-byte tag),
+# Fernet = b64(version + timestamp + IV + one AES block + HMAC)
+_MIN_AESGCM_TOKEN_LEN = len(_AESGCM_PREFIX) + 40
+_MIN_FERNET_TOKEN_LEN = 100
+
 
 def get_encryption_key() -> bytes:
     """
@@ -31,28 +47,51 @@ def get_encryption_key() -> bytes:
     return urlsafe_b64encode(key_material)
 
 
+@lru_cache(maxsize=1)
+def _get_fernet() -> Fernet:
+    """
+    Return the shared Fernet instance.
+    
+    The key is derived from SECRET_KEY, which does not change at runtime,
+    so key derivation and Fernet setup happen once per process.
+    """
+    return Fernet(get_encryption_key())
+
+
+@lru_cache(maxsize=1)
+def _get_aesgcm() -> AESGCM:
+    """
+    Return the shared AES-GCM cipher.
+    
+    The 32-byte key is derived from SECRET_KEY with its own label, so it
+    differs from the Fernet key material.
+    """
+    key = hashlib.sha256(b"aes-gcm:" + settings.SECRET_KEY.encode()).digest()
+    return AESGCM(key)
+
+
 def encrypt_data(data: str) -> Optional[str]:
     """
-    Encrypt sensitive data using Fernet symmetric encryption.
+    Encrypt sensitive data using AES-256-GCM.
     
     Args:
         data: Plain text string to encrypt
         
     Returns:
-        Encrypted data as a base64-encoded string, or None if encryption fails
+        Encrypted data as a version-tagged base64 string, or None if encryption fails
         
     Example:
         >>> encrypted = encrypt_data("sensitive information")
         >>> print(encrypted)
-        'gAAAAABh...'
+        'v1:q3Jd...'
     """
     if not data:
         return None
         
     try:
-        fernet = Fernet(get_encryption_key())
-        encrypted_bytes = fernet.encrypt(data.encode())
-        return encrypted_bytes.decode()
+        nonce = os.urandom(_NONCE_SIZE)
+        encrypted_bytes = _get_aesgcm().encrypt(nonce, data.encode(), None)
+        return _AESGCM_PREFIX + urlsafe_b64encode(nonce + encrypted_bytes).decode()
     except Exception as e:
         logger.error(f"Failed to encrypt data: {e}")
         return None
@@ -63,7 +102,7 @@ def decrypt_data(encrypted_data: str) -> Optional[str]:
     Decrypt data that was encrypted with encrypt_data().
     
     Args:
-        encrypted_data: Base64-encoded encrypted string
+        encrypted_data: AES-GCM ("v1:...") or legacy Fernet token
         
     Returns:
         Decrypted plain text string, or None if decryption fails
@@ -77,10 +116,14 @@ def decrypt_data(encrypted_data: str) -> Optional[str]:
         return None
         
     try:
-        fernet = Fernet(get_encryption_key())
-        decrypted_bytes = fernet.decrypt(encrypted_data.encode())
+        if encrypted_data.startswith(_AESGCM_PREFIX):
+            raw = urlsafe_b64decode(encrypted_data[len(_AESGCM_PREFIX):])
+            nonce, encrypted_bytes = raw[:_NONCE_SIZE], raw[_NONCE_SIZE:]
+            decrypted_bytes = _get_aesgcm().decrypt(nonce, encrypted_bytes, None)
+        else:
+            decrypted_bytes = _get_fernet().decrypt(encrypted_data.encode())
         return decrypted_bytes.decode()
-    except InvalidToken:
+    except (InvalidToken, InvalidTag, BinasciiError):
         logger.error("Failed to decrypt data: Invalid token or key")
         return None
     except Exception as e:
@@ -96,14 +139,17 @@ def is_encrypted(data: str) -> bool:
         data: String to check
         
     Returns:
-        True if data appears to be Fernet-encrypted, False otherwise
+        True if data appears to be an AES-GCM or Fernet token, False otherwise
         
     Note:
-        This is a simple heuristic based on Fernet token format.
-        It checks if the string starts with "gAAAAA" which is common for Fernet tokens.
+        This is a simple heuristic based on the token prefix and minimum
+        length: "v1:" for AES-GCM tokens, "gA" for legacy Fernet tokens.
     """
     if not data or not isinstance(data, str):
         return False
     
-    # Fernet tokens start with version byte (0x80) which becomes 'gAAAAA' in base64
-    return data.startswith('gAAAAA')
+    first = data[0]
+    if first == 'v':
+        return len(data) >= _MIN_AESGCM_TOKEN_LEN and data[1] == '1' and data[2] == ':'
+    # Fernet tokens start with version byte (0x80) which becomes 'gA' in base64
+    return first == 'g' and len(data) >= _MIN_FERNET_TOKEN_LEN and data[1] == 'A'
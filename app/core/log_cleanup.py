@@ -1,20 +1,25 @@
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 from core.database import SessionLocal
 from modules.admin.models import AuditLog
 import logging
 
 logger = logging.getLogger("app")
 
+# Сколько строк архивируем за одну транзакцию
+CLEANUP_CHUNK_SIZE = 5000
+
 
 def cleanup_expired_logs():
     """
     Удаляет или архивирует просроченные логи
     """
     db: Session = SessionLocal()
+    archived_count = 0
     
     try:
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         
         # # ✅ Вариант 1: Удалить просроченные
         # deleted_count = db.query(AuditLog).filter(
@@ -23,12 +28,31 @@ def cleanup_expired_logs():
         # ).delete(synchronize_session=False)
         
         # ✅ Вариант 2: Пометить как архивные (soft delete)
-        archived_count = db.query(AuditLog).filter(
-            AuditLog.expires_at <= now,
-            AuditLog.is_archived == False
-        ).update({"is_archived": True}, synchronize_session=False)
-        
-        db.commit()
+        # Пачками по CLEANUP_CHUNK_SIZE: короткие транзакции не блокируют
+        # вставку логов; SKIP LOCKED пропускает строки, занятые параллельной очисткой
+        expired_ids = (
+            select(AuditLog.id)
+            .where(
+                AuditLog.expires_at <= now,
+                AuditLog.is_archived == False
+            )
+            .limit(CLEANUP_CHUNK_SIZE)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        archive_chunk = (
+            update(AuditLog)
+            .where(AuditLog.id.in_(expired_ids))
+            .values(is_archived=True)
+            .execution_options(synchronize_session=False)
+        )
+
+        while True:
+            chunk_count = db.execute(archive_chunk).rowcount
+            db.commit()
+            archived_count += chunk_count
+            if chunk_count < CLEANUP_CHUNK_SIZE:
+                break
         
         logger.info({
             "event": "log_cleanup",
@@ -42,9 +66,10 @@ def cleanup_expired_logs():
         db.rollback()
         logger.error({
             "event": "log_cleanup_error",
-            "error": str(e)
+            "error": str(e),
+            "archived_before_error": archived_count
         })
-        return 0
+        return archived_count
     finally:
         db.close()
 
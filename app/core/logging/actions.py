@@ -1,12 +1,15 @@
+import asyncio
 import logging
+import re
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from fastapi import Request
 from modules.auth.models import User
 from core.logging.geoip_resolver import resolve_geo
 from core.database import SessionLocal
-from modules.monitoring.service_alerts import AlertService
-from modules.monitoring.models import AlertSeverity, AlertType
-from core.config import APP_TIMEZONE, now, format_timestamp, TIMEZONE_NAME
+from modules.monitoring.models import Alert, AlertSeverity, AlertType
+from core.config import APP_TIMEZONE, now, TIMEZONE_NAME
 
 # ============================
 #  Единые логгеры
@@ -15,6 +18,16 @@
 security_logger = logging.getLogger("security")
 system_logger = logging.getLogger("system")
 
+# Ссылки на fire-and-forget задачи, чтобы их не собрал GC до завершения
+_background_tasks: set[asyncio.Task] = set()
+
+# Алерты в БД пишутся пачками из фоновой задачи, а не по одному на событие
+ALERT_QUEUE_MAX_SIZE = 10_000
+ALERT_BUFFER_MAX_SIZE = 500
+ALERT_BUFFER_FLUSH_INTERVAL = 5  # секунд
+_alert_queue: asyncio.Queue = asyncio.Queue(maxsize=ALERT_QUEUE_MAX_SIZE)
+_alert_flusher_task: Optional[asyncio.Task] = None
+
 # ============================
 #  Автоматическая категоризация
 # ============================
@@ -35,16 +48,40 @@
     }
 }
 
+# Один скомпилированный regex на категорию вместо цикла по подстрокам;
+# порядок категорий (приоритет) сохраняется
+_CATEGORY_PATTERNS = tuple(
+    (category, re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True)))))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+)
+
+# Имена событий — небольшой повторяющийся словарь, поэтому результат кешируем
+@lru_cache(maxsize=1024)
 def categorize_event(event: str) -> str:
     """Определяет категорию события по ключевым словам"""
     event_lower = event.lower()
     
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        if any(k in event_lower for k in keywords):
+    for category, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(event_lower):
             return category
     
     return "user"
 
+def _format_timestamps(dt: datetime) -> tuple[str, str, str]:
+    """
+    (ISO с таймзоной, для отображения, UTC для сортировки) — то же, что
+    format_timestamp с форматами "iso", "msk" и "utc". Строка для отображения
+    берётся из ISO (первые 19 символов без "T"); UTC тоже, если dt уже в UTC,
+    иначе — второй isoformat() после перевода в UTC
+    """
+    iso = dt.isoformat()
+    display = iso[:19].replace("T", " ", 1)
+    if iso.endswith("+00:00"):
+        utc = iso[:-6] + "Z"
+    else:
+        utc = dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    return iso, display, utc
+
 # ============================
 #  Базовая функция сбора данных
 # ============================
@@ -57,48 +94,41 @@ def _build_log_data(
 ) -> Dict[str, Any]:
     """Единый строитель данных для всех логов"""
     
-    # Request ID
-    request_id = None
-    if request and hasattr(request, "state") and hasattr(request.state, "request_id"):
-        request_id = request.state.request_id
-    
     # ✅ Используем нашу функцию now() из config
-    current_time = now()
+    timestamp, timestamp_display, timestamp_utc = _format_timestamps(now())
     
     # Базовые данные
     data = {
         "event": event,
         "category": categorize_event(event),
-        "timestamp": format_timestamp(current_time, format="iso"),     # ISO с таймзоной
-        "timestamp_display": format_timestamp(current_time, format="msk"),  # для отображения
-        "timestamp_utc": format_timestamp(current_time, format="utc"),      # для сортировки
+        "timestamp": timestamp,                  # ISO с таймзоной
+        "timestamp_display": timestamp_display,  # для отображения
+        "timestamp_utc": timestamp_utc,          # для сортировки
         "timezone": TIMEZONE_NAME,
-        "request_id": request_id,
+        "request_id": None,
     }
     
-    # IP и User-Agent
-    if request:
-        data["ip"] = request.client.host if request.client else None
+    # Request ID, IP и User-Agent — один проход по request
+    if request is not None:
+        data["request_id"] = getattr(getattr(request, "state", None), "request_id", None)
+        client = request.client
+        data["ip"] = client.host if client else None
         data["user_agent"] = request.headers.get("user-agent")
     
     # Актёр (кто совершает действие)
     if actor:
-        data.update({
-            "actor_id": actor.id,
-            "actor_email": actor.email,
-            "actor_role": actor.role.value if hasattr(actor.role, 'value') else actor.role,
-        })
+        data["actor_id"] = actor.id
+        data["actor_email"] = actor.email
+        data["actor_role"] = getattr(actor.role, "value", actor.role)
     else:
         data["actor_id"] = None
     
     # Целевой пользователь (над кем действие)
     if target_user:
-        data.update({
-            "target_user_id": target_user.id,
-            "target_user_email": target_user.email,
-            "target_user_role": target_user.role.value if hasattr(target_user.role, 'value') else target_user.role,
-            "target_user_first_name": target_user.first_name,
-        })
+        data["target_user_id"] = target_user.id
+        data["target_user_email"] = target_user.email
+        data["target_user_role"] = getattr(target_user.role, "value", target_user.role)
+        data["target_user_first_name"] = target_user.first_name
     
     # Дополнительные данные
     if extra:
@@ -108,6 +138,25 @@ def _build_log_data(
     
     return data
 
+# ============================
+#  Маршрутизация по логгерам
+# ============================
+def _route(category: str, level: str) -> tuple[logging.Logger, int]:
+    """Логгер и уровень, в который попадёт событие"""
+    if category == "security" or level == "WARNING":
+        return security_logger, logging.WARNING
+    if category == "system":
+        return system_logger, logging.INFO
+    return app_logger, logging.INFO
+
+def _is_needed(event: str, level: str = "INFO", create_alert: bool = False) -> bool:
+    """Будет ли событие записано или создаст алерт (иначе задачу можно не запускать)"""
+    category = categorize_event(event)
+    if create_alert or category == "security":
+        return True
+    target_logger, levelno = _route(category, level)
+    return target_logger.isEnabledFor(levelno)
+
 # ============================
 #  ЕДИНАЯ ФУНКЦИЯ ДЛЯ ВСЕХ СОБЫТИЙ
 # ============================
@@ -129,42 +178,136 @@ async def log_event(
     await log_event("failed_login", level="WARNING", create_alert=True, email="test@mail.com")
     """
     
+    # Определяем логгер и уровень
+    category = categorize_event(event)
+    target_logger, levelno = _route(category, level)
+    log_enabled = target_logger.isEnabledFor(levelno)
+    need_alert = create_alert or category == "security"
+    
+    # Ни запись в лог, ни алерт не нужны — данные не собираем
+    if not log_enabled and not need_alert:
+        return
+    
     # Собираем данные
     data = _build_log_data(event, actor, target_user, request, extra)
     
-    # Определяем логгер и уровень
-    category = data["category"]
-    
     # Гео-данные только для security
-    if category == "security" or create_alert:
+    if need_alert:
         ip = data.get("ip")
         if ip:
             geo = await resolve_geo(ip)
             data.update(geo)
     
     # Логируем в соответствующий логгер
-    if category == "security" or level == "WARNING":
-        security_logger.warning(data)
-    elif category == "system":
-        system_logger.info(data)
-    else:
-        app_logger.info(data)
+    if log_enabled:
+        target_logger.log(levelno, data)
     
-    # Создаём алерт в БД если нужно
-    if create_alert or category == "security":
-        db = SessionLocal()
+    # Ставим алерт в очередь на запись в БД
+    if need_alert:
+        _enqueue_alert({
+            "timestamp": datetime.now(timezone.utc),
+            "severity": AlertSeverity.HIGH if level == "WARNING" else AlertSeverity.MEDIUM,
+            "type": AlertType.SECURITY_EVENT,
+            "message": event,
+            "user_id": actor.id if actor else None,
+            "ip_address": data.get("ip"),
+            "details": data,
+        })
+
+# ============================
+#  Очередь алертов
+# ============================
+def _enqueue_alert(alert: Dict[str, Any]):
+    """Кладёт алерт в очередь; при переполнении алерт отбрасывается"""
+    start_alert_flusher()
+    try:
+        _alert_queue.put_nowait(alert)
+    except asyncio.QueueFull:
+        app_logger.error({
+            "event": "alert_queue_full",
+            "dropped_alert": alert["message"],
+            "queue_size": ALERT_QUEUE_MAX_SIZE,
+        })
+
+def start_alert_flusher():
+    """Запускает фоновую запись алертов (при старте приложения или первом алерте)"""
+    global _alert_flusher_task
+    if _alert_flusher_task is None or _alert_flusher_task.done():
+        _alert_flusher_task = asyncio.create_task(_alert_flusher())
+
+async def stop_alert_flusher():
+    """Останавливает фоновую запись и дописывает оставшиеся алерты"""
+    global _alert_flusher_task
+    task, _alert_flusher_task = _alert_flusher_task, None
+    if task is not None and not task.done():
+        task.cancel()
         try:
-            AlertService.create_alert(
-                db=db,
-                severity=AlertSeverity.HIGH if level == "WARNING" else AlertSeverity.MEDIUM,
-                type=AlertType.SECURITY_EVENT,
-                message=event,
-                user_id=actor.id if actor else None,
-                ip_address=data.get("ip"),
-                details=data
-            )
+            await task
+        except asyncio.CancelledError:
+            pass
+    
+    pending = []
+    while not _alert_queue.empty():
+        pending.append(_alert_queue.get_nowait())
+    if pending:
+        await _write_alerts(pending)
+
+async def _alert_flusher():
+    """Пачка — до ALERT_BUFFER_MAX_SIZE алертов или всё, что пришло за ALERT_BUFFER_FLUSH_INTERVAL"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await _alert_queue.get()]
+        deadline = loop.time() + ALERT_BUFFER_FLUSH_INTERVAL
+        try:
+            while len(batch) < ALERT_BUFFER_MAX_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(_alert_queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
         finally:
-            db.close()
+            # В т.ч. при остановке: собранная пачка не теряется
+            await _write_alerts(batch)
+
+async def _write_alerts(batch: list):
+    try:
+        await asyncio.to_thread(_insert_alerts, batch)
+    except Exception as e:
+        app_logger.error({
+            "event": "alert_batch_write_failed",
+            "error": str(e),
+            "error_type": type(e).__name__,
+            "batch_size": len(batch),
+        })
+
+def _insert_alerts(batch: list):
+    """Запись пачки алертов в БД одной транзакцией (выполняется в пуле потоков)"""
+    db = SessionLocal()
+    try:
+        db.bulk_insert_mappings(Alert, batch)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def _on_task_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        app_logger.error({
+            "event": "log_event_task_failed",
+            "error": str(task.exception()),
+            "error_type": type(task.exception()).__name__,
+        })
+
+def _spawn_log_event(**kwargs):
+    """Запускает log_event в фоне, сохраняя ссылку на задачу"""
+    task = asyncio.create_task(log_event(**kwargs))
+    _background_tasks.add(task)
+    task.add_done_callback(_on_task_done)
 
 # ============================
 #  Функции-обёртки для обратной совместимости
@@ -181,27 +324,30 @@ async def log_security_event(event: str, request=None, user=None, extra=None):
     )
 
 def log_admin_action(event: str, admin: User | None, request: Request, extra: dict | None = None):
-    import asyncio
-    asyncio.create_task(log_event(
+    if not _is_needed(event):
+        return
+    _spawn_log_event(
         event=event,
         actor=admin,
         request=request,
         **(extra or {})
-    ))
+    )
 
 def log_user_action(event: str, user: User | None, request: Request, extra: dict | None = None):
-    import asyncio
-    asyncio.create_task(log_event(
+    if not _is_needed(event):
+        return
+    _spawn_log_event(
         event=event,
         actor=user,
         request=request,
         **(extra or {})
-    ))
+    )
 
 def log_system_event(event: str, extra: dict | None = None):
-    import asyncio
-    asyncio.create_task(log_event(
+    if not _is_needed(event):
+        return
+    _spawn_log_event(
         event=event,
         level="INFO",
         **(extra or {})
-    ))
\ No newline at end of file
+    )
\ No newline at end of file
@@ -3,8 +3,16 @@
 """
 import logging
 import re
+from functools import lru_cache
 from typing import Set, Pattern
 
+try:
+    # Optional: google-re2 matches in linear time, so redaction of untrusted
+    # input cannot hit catastrophic backtracking
+    import re2
+except ImportError:
+    re2 = None
+
 
 class SensitiveDataFilter(logging.Filter):
     """
@@ -12,40 +20,63 @@ class SensitiveDataFilter(logging.Filter):
     Removes passwords, tokens, API keys, and other sensitive information
     """
     
-    # Patterns for sensitive data
+    # Patterns for sensitive data: (group name, regex, replacement)
     SENSITIVE_PATTERNS = [
         # Password fields
-        (re.compile(r'"password"\s*:\s*"[^"]*"', re.IGNORECASE), '"password": "***REDACTED***"'),
-        (re.compile(r"'password'\s*:\s*'[^']*'", re.IGNORECASE), "'password': '***REDACTED***'"),
-        (re.compile(r'password=\S+', re.IGNORECASE), 'password=***REDACTED***'),
+        ('pw_dq', r'"password"\s*:\s*"[^"]*"', '"password": "***REDACTED***"'),
+        ('pw_sq', r"'password'\s*:\s*'[^']*'", "'password': '***REDACTED***'"),
+        ('pw_kv', r'password=\S+', 'password=***REDACTED***'),
         
         # Token fields
-        (re.compile(r'"token"\s*:\s*"[^"]*"', re.IGNORECASE), '"token": "***REDACTED***"'),
-        (re.compile(r"'token'\s*:\s*'[^']*'", re.IGNORECASE), "'token': '***REDACTED***'"),
-        (re.compile(r'token=\S+', re.IGNORECASE), 'token=***REDACTED***'),
+        ('tok_dq', r'"token"\s*:\s*"[^"]*"', '"token": "***REDACTED***"'),
+        ('tok_sq', r"'token'\s*:\s*'[^']*'", "'token': '***REDACTED***'"),
+        ('tok_kv', r'token=\S+', 'token=***REDACTED***'),
         
         # Bearer tokens
-        (re.compile(r'Bearer\s+[\w\-\.]+', re.IGNORECASE), 'Bearer ***REDACTED***'),
+        ('bearer', r'Bearer\s+[\w\-\.]+', 'Bearer ***REDACTED***'),
         
         # API keys
-        (re.compile(r'"api_key"\s*:\s*"[^"]*"', re.IGNORECASE), '"api_key": "***REDACTED***"'),
-        (re.compile(r"'api_key'\s*:\s*'[^']*'", re.IGNORECASE), "'api_key': '***REDACTED***'"),
-        (re.compile(r'api_key=\S+', re.IGNORECASE), 'api_key=***REDACTED***'),
+        ('key_dq', r'"api_key"\s*:\s*"[^"]*"', '"api_key": "***REDACTED***"'),
+        ('key_sq', r"'api_key'\s*:\s*'[^']*'", "'api_key': '***REDACTED***'"),
+        ('key_kv', r'api_key=\S+', 'api_key=***REDACTED***'),
         
         # Secret keys
-        (re.compile(r'"secret"\s*:\s*"[^"]*"', re.IGNORECASE), '"secret": "***REDACTED***"'),
-        (re.compile(r"'secret'\s*:\s*'[^']*'", re.IGNORECASE), "'secret': '***REDACTED***'"),
+        ('sec_dq', r'"secret"\s*:\s*"[^"]*"', '"secret": "***REDACTED***"'),
+        ('sec_sq', r"'secret'\s*:\s*'[^']*'", "'secret': '***REDACTED***'"),
         
-        # Authorization headers
-        (re.compile(r'Authorization:\s*\S+', re.IGNORECASE), 'Authorization: ***REDACTED***'),
+        # Authorization headers (the scheme and the credentials after it)
+        ('auth', r'Authorization:\s*(?:Bearer\s+)?\S+', 'Authorization: ***REDACTED***'),
         
         # Credit card numbers (basic pattern)
-        (re.compile(r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b'), '****-****-****-****'),
+        ('card', r'\b\d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}\b', '****-****-****-****'),
         
         # Social security numbers (US format)
-        (re.compile(r'\b\d{3}-\d{2}-\d{4}\b'), '***-**-****'),
+        ('ssn', r'\b\d{3}-\d{2}-\d{4}\b', '***-**-****'),
     ]
     
+    # All patterns as one alternation: a single scan per string, the callback
+    # picks the replacement by the name of the alternative that matched.
+    # RE2 is used when installed (its \d, \w and \b are ASCII-only)
+    _COMBINED_PATTERN = '|'.join(f'(?P<{name}>{regex})' for name, regex, _ in SENSITIVE_PATTERNS)
+    if re2 is not None:
+        _COMBINED = re2.compile('(?i)' + _COMBINED_PATTERN)
+    else:
+        _COMBINED = re.compile(_COMBINED_PATTERN, re.IGNORECASE)
+    _REPLACEMENTS = {name: replacement for name, _, replacement in SENSITIVE_PATTERNS}
+    
+    # Every keyword pattern contains one of these literals; card/SSN need digits
+    _LITERAL_HINTS = ('password', 'token', 'api_key', 'secret', 'bearer', 'authorization')
+    _DIGITS = re.compile(r'\d{3}')
+    # Shortest possible match is "token=x"
+    _MIN_MATCH_LEN = 7
+    
+    # Keys redacted wholesale: anything containing password/token,
+    # or exactly one of the other sensitive names
+    _SENSITIVE_KEY_RE = re.compile(
+        r'password|token|^(?:api_key|secret_key|secret|authorization)$',
+        re.IGNORECASE,
+    )
+    
     def filter(self, record: logging.LogRecord) -> bool:
         """
         Filter log record to redact sensitive data
@@ -85,14 +116,22 @@ def _redact_sensitive_data(self, text: str) -> str:
         Returns:
             Redacted text
         """
-        for pattern, replacement in self.SENSITIVE_PATTERNS:
-            text = pattern.sub(replacement, text)
-        return text
+        if len(text) < self._MIN_MATCH_LEN:
+            return text
+        
+        lowered = text.lower()
+        if not any(hint in lowered for hint in self._LITERAL_HINTS) and not self._DIGITS.search(text):
+            return text
+        
+        replacements = self._REPLACEMENTS
+        return self._COMBINED.sub(lambda match: replacements[match.lastgroup], text)
     
     def _redact_dict(self, data: dict) -> dict:
         """
         Redact sensitive data from dictionary
         
+        Nested dicts are walked with an explicit stack instead of recursion.
+        
         Args:
             data: Dictionary to redact
             
@@ -100,19 +139,20 @@ def _redact_dict(self, data: dict) -> dict:
             Redacted dictionary
         """
         redacted = {}
-        sensitive_keys = {'password', 'token', 'api_key', 'secret', 'authorization', 'secret_key'}
+        stack = [(data, redacted)]
         
-        for key, value in data.items():
-            key_lower = key.lower()
-            
-            if key_lower in sensitive_keys or 'password' in key_lower or 'token' in key_lower:
-                redacted[key] = '***REDACTED***'
-            elif isinstance(value, dict):
-                redacted[key] = self._redact_dict(value)
-            elif isinstance(value, str):
-                redacted[key] = self._redact_sensitive_data(value)
-            else:
-                redacted[key] = value
+        while stack:
+            source, target = stack.pop()
+            for key, value in source.items():
+                if _classify_key(key) & KEY_SENSITIVE:
+                    target[key] = '***REDACTED***'
+                elif isinstance(value, dict):
+                    child = target[key] = {}
+                    stack.append((value, child))
+                elif isinstance(value, str):
+                    target[key] = self._redact_sensitive_data(value)
+                else:
+                    target[key] = value
         
         return redacted
 
@@ -123,6 +163,13 @@ class PIIFilter(logging.Filter):
     Partially masks emails, phone numbers, and other PII
     """
     
+    _PII_KEYS = frozenset({'email', 'phone', 'telephone', 'mobile'})
+    
+    _EMAIL_RE = re.compile(r'\b([a-zA-Z0-9])[a-zA-Z0-9._-]*@([a-zA-Z0-9.-]+)\b')
+    _PHONE_RE = re.compile(r'\b(\+?\d{1,3}[\s-]?)?\(?\d{3}\)?[\s-]?\d{3}[\s-]?(\d{4})\b')
+    # Every phone match contains three consecutive digits
+    _DIGITS = re.compile(r'\d{3}')
+    
     def filter(self, record: logging.LogRecord) -> bool:
         """
         Filter log record to mask PII
@@ -152,19 +199,15 @@ def _mask_pii(self, text: str) -> str:
         Returns:
             Masked text
         """
+        # Nothing to mask without an '@' or a run of digits
+        if '@' not in text and not self._DIGITS.search(text):
+            return text
+        
         # Mask email addresses (keep first character and domain)
-        text = re.sub(
-            r'\b([a-zA-Z0-9])[a-zA-Z0-9._-]*@([a-zA-Z0-9.-]+)\b',
-            r'\1***@\2',
-            text
-        )
+        text = self._EMAIL_RE.sub(r'\1***@\2', text)
         
         # Mask phone numbers (keep last 4 digits)
-        text = re.sub(
-            r'\b(\+?\d{1,3}[\s-]?)?\(?\d{3}\)?[\s-]?\d{3}[\s-]?(\d{4})\b',
-            r'***-***-\2',
-            text
-        )
+        text = self._PHONE_RE.sub(r'***-***-\2', text)
         
         return text
     
@@ -179,21 +222,22 @@ def _mask_dict(self, data: dict) -> dict:
             Masked dictionary
         """
         masked = {}
+        stack = [(data, masked)]
         
-        for key, value in data.items():
-            if isinstance(value, dict):
-                masked[key] = self._mask_dict(value)
-            elif isinstance(value, str):
-                # Check if key suggests PII
-                if key.lower() in {'email', 'phone', 'telephone', 'mobile'}:
+        while stack:
+            source, target = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict):
+                    child = target[key] = {}
+                    stack.append((value, child))
+                elif isinstance(value, str) and _classify_key(key) & KEY_PII:
+                    # Key suggests PII
                     if '@' in value:
-                        masked[key] = self._mask_email(value)
+                        target[key] = self._mask_email(value)
                     else:
-                        masked[key] = self._mask_pii(value)
+                        target[key] = self._mask_pii(value)
                 else:
-                    masked[key] = value
-            else:
-                masked[key] = value
+                    target[key] = value
         
         return masked
     
@@ -222,6 +266,27 @@ def _mask_email(self, email: str) -> str:
             return '***@masked'
 
 
+# Key classification flags
+KEY_SENSITIVE = 1
+KEY_PII = 2
+
+
+@lru_cache(maxsize=1024)
+def _classify_key(key: str) -> int:
+    """
+    Classify a payload key once; audit payloads reuse a small set of keys
+    
+    Returns:
+        Bit flags: KEY_SENSITIVE (redact the value), KEY_PII (mask the value)
+    """
+    flags = 0
+    if SensitiveDataFilter._SENSITIVE_KEY_RE.search(key):
+        flags |= KEY_SENSITIVE
+    if key.lower() in PIIFilter._PII_KEYS:
+        flags |= KEY_PII
+    return flags
+
+
 class SecurityEventFilter(logging.Filter):
     """
     Filter to route security events to separate handler
@@ -242,6 +307,12 @@ class SecurityEventFilter(logging.Filter):
         'security_event',
     }
     
+    # One case-insensitive scan instead of a substring test per keyword
+    _SECURITY_RE = re.compile(
+        '|'.join(re.escape(event) for event in sorted(SECURITY_EVENTS)),
+        re.IGNORECASE,
+    )
+    
     def filter(self, record: logging.LogRecord) -> bool:
         """
         Filter security events
@@ -252,18 +323,14 @@ def filter(self, record: logging.LogRecord) -> bool:
         Returns:
             True if security event, False otherwise
         """
-        # Check if this is a security event
-        is_security = False
-        
-        # Check in message dict
-        if isinstance(record.msg, dict):
-            event_type = record.msg.get('event', '')
-            is_security = any(sec_event in event_type.lower() for sec_event in self.SECURITY_EVENTS)
+        # Event name from a dict message, or the message string itself
+        msg = record.msg
+        if isinstance(msg, dict):
+            text = msg.get('event', '')
+        else:
+            text = msg
         
-        # Check in message string
-        elif isinstance(record.msg, str):
-            msg_lower = record.msg.lower()
-            is_security = any(sec_event in msg_lower for sec_event in self.SECURITY_EVENTS)
+        is_security = isinstance(text, str) and self._SECURITY_RE.search(text) is not None
         
         # Mark as security event
         if is_security:
@@ -272,6 +339,10 @@ def filter(self, record: logging.LogRecord) -> bool:
         return True
 
 
+# (name, enable_pii_masking, enable_sensitive_redaction) already configured
+_CONFIGURED: Set[tuple] = set()
+
+
 def get_logger(name: str, enable_pii_masking: bool = True, enable_sensitive_redaction: bool = True) -> logging.Logger:
     """
     Get a configured logger with appropriate filters
@@ -286,6 +357,10 @@ def get_logger(name: str, enable_pii_masking: bool = True, enable_sensitive_reda
     """
     logger = logging.getLogger(name)
     
+    config_key = (name, enable_pii_masking, enable_sensitive_redaction)
+    if config_key in _CONFIGURED:
+        return logger
+    
     # Add filters if not already present
     if enable_sensitive_redaction:
         has_sensitive_filter = any(isinstance(f, SensitiveDataFilter) for f in logger.filters)
@@ -302,4 +377,5 @@ def get_logger(name: str, enable_pii_masking: bool = True, enable_sensitive_reda
     if not has_security_filter:
         logger.addFilter(SecurityEventFilter())
     
+    _CONFIGURED.add(config_key)
     return logger
@@ -3,12 +3,27 @@
 """
 import logging
 import socket
-import json
-from datetime import datetime
-import pytz
+import orjson
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 from core.config import settings
-import traceback
+
+# Europe/Moscow без перехода на летнее время с 2011 года — фиксированного
+# смещения достаточно и не нужно разбирать таблицу переходов pytz на каждую запись
+_MSK = timezone(timedelta(hours=3), name="MSK")
+
+# datetime в log_data сериализуется orjson в ISO-8601 сам, без isoformat();
+# нестроковые ключи в extra допускаются, как и раньше с json.dumps
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+# Не меняются за время жизни процесса — не читаем их на каждую запись
+_HOSTNAME = socket.gethostname()
+_SERVICE = settings.APP_NAME
+
+# Контекстные поля, которые middleware/фильтры кладут в record через extra
+_EXTRA_FIELDS = ("event", "request_id", "session_id", "user_id", "ip", "user_agent")
+_MISSING = object()
+
 
 class EnhancedJSONFormatter(logging.Formatter):
     """
@@ -29,23 +44,27 @@ def __init__(self, environment: str = "development", include_trace: bool = True)
         self.include_trace = include_trace
 
     def format(self, record: logging.LogRecord) -> str:
+        return self.format_bytes(record).decode()
+
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """Запись в виде UTF-8 JSON — для потоков, принимающих bytes"""
         # Moscow time
-        moscow_tz = pytz.timezone("Europe/Moscow")
-        dt = datetime.fromtimestamp(record.created, tz=pytz.utc).astimezone(moscow_tz)
+        dt = datetime.fromtimestamp(record.created, tz=_MSK)
 
         log_data = {
-            "timestamp": dt.isoformat(),
+            "timestamp": dt,
             "level": record.levelname,
             "logger": record.name,
             "event_type": record.name,  # app / audit / system / security
             "environment": self.environment,
-            "service": settings.APP_NAME,
-            "hostname": socket.gethostname(),
+            "service": _SERVICE,
+            "hostname": _HOSTNAME,
         }
 
-        # Основные поля
-        for field in ["event", "request_id", "session_id", "user_id", "ip", "user_agent"]:
-            value = getattr(record, field, None)
+        # Основные поля — прямо из __dict__, без getattr на каждое поле
+        rd = record.__dict__
+        for field in _EXTRA_FIELDS:
+            value = rd.get(field)
             if value is not None:
                 log_data[field] = value
 
@@ -55,8 +74,9 @@ def format(self, record: logging.LogRecord) -> str:
         log_data["line"] = record.lineno
 
         # Сообщение
-        if isinstance(record.msg, dict):
-            log_data["extra"] = record.msg
+        msg = record.msg
+        if isinstance(msg, dict):
+            log_data["extra"] = msg
         else:
             log_data["message"] = record.getMessage()
 
@@ -77,14 +97,15 @@ def format(self, record: logging.LogRecord) -> str:
         if record.stack_info and self.include_trace:
             log_data["stack_info"] = record.stack_info
 
-        return json.dumps(log_data, ensure_ascii=False, default=str)
+        return orjson.dumps(log_data, default=str, option=_ORJSON_OPTIONS)
 
 
 
 class CompactJSONFormatter(logging.Formatter):
     """
     Compact JSON formatter for production use
-    Excludes detailed trace information to reduce log size
+    Excludes detailed trace information to reduce log size;
+    time is an epoch-milliseconds integer instead of an ISO string
     """
     
     def __init__(self, environment: str = "production"):
@@ -107,30 +128,42 @@ def format(self, record: logging.LogRecord) -> str:
         Returns:
             JSON formatted log string
         """
-        # Convert time to Moscow timezone
-        moscow_tz = pytz.timezone('Europe/Moscow')
-        dt = datetime.fromtimestamp(record.created, tz=pytz.utc)
-        moscow_time = dt.astimezone(moscow_tz)
+        return self.format_bytes(record).decode()
+    
+    def format_bytes(self, record: logging.LogRecord) -> bytes:
+        """
+        Format log record as compact UTF-8 JSON bytes
         
+        Args:
+            record: Log record to format
+            
+        Returns:
+            JSON encoded log record
+        """
         # Compact log data
         log_data = {
-            "ts": moscow_time.isoformat(),
+            "ts_ms": int(record.created * 1000),  # Unix epoch, milliseconds (UTC)
             "lvl": record.levelname[0],  # First letter only (I, W, E, D)
             "logger": record.name,
             "env": self.environment,
         }
         
+        rd = record.__dict__
+        
         # Add request_id if present
-        if hasattr(record, 'request_id'):
-            log_data["req_id"] = record.request_id
+        request_id = rd.get('request_id', _MISSING)
+        if request_id is not _MISSING:
+            log_data["req_id"] = request_id
         
         # Add user_id if present
-        if hasattr(record, 'user_id'):
-            log_data["user"] = record.user_id
+        user_id = rd.get('user_id', _MISSING)
+        if user_id is not _MISSING:
+            log_data["user"] = user_id
         
         # Handle message
-        if isinstance(record.msg, dict):
-            log_data.update(record.msg)
+        msg = record.msg
+        if isinstance(msg, dict):
+            log_data.update(msg)
         else:
             log_data["msg"] = record.getMessage()
         
@@ -138,7 +171,34 @@ def format(self, record: logging.LogRecord) -> str:
         if record.exc_info and record.exc_info[0]:
             log_data["exc"] = record.exc_info[0].__name__
         
-        return json.dumps(log_data, ensure_ascii=False, separators=(',', ':'), default=str)
+        return orjson.dumps(log_data, default=str, option=_ORJSON_OPTIONS)
+
+
+class ConsoleJSONFormatter(logging.Formatter):
+    """
+    JSON-форматтер для stdout (uvicorn и логгеры приложения из LOGGING_CONFIG).
+    Время по Москве, dict-сообщение мержится в корень записи.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        log_data = {
+            "time": datetime.fromtimestamp(record.created, tz=_MSK).strftime("%Y-%m-%d %H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+        }
+
+        # Если message — словарь, мержим его в корень
+        msg = record.msg
+        if isinstance(msg, dict):
+            log_data.update(msg)
+        else:
+            log_data["message"] = record.getMessage()
+
+        # Добавляем exception, если есть
+        if record.exc_info:
+            log_data["exception"] = self.formatException(record.exc_info)
+
+        return orjson.dumps(log_data, default=str, option=_ORJSON_OPTIONS).decode()
 
 
 class DevelopmentFormatter(logging.Formatter):
@@ -172,11 +232,13 @@ def format(self, record: logging.LogRecord) -> str:
         reset = self.COLORS['RESET']
         
         # Format timestamp
-        timestamp = datetime.fromtimestamp(record.created).strftime('%H:%M:%S.%f')[:-3]
+        timestamp = datetime.fromtimestamp(record.created, tz=_MSK).strftime('%H:%M:%S.%f')[:-3]
         
         # Format message
         if isinstance(record.msg, dict):
-            message = json.dumps(record.msg, indent=2, ensure_ascii=False)
+            message = orjson.dumps(
+                record.msg, default=str, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2
+            ).decode()
         else:
             message = record.getMessage()
         
@@ -1,7 +1,77 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
 import httpx
+import orjson
+
+from core.redis import get_redis
 
 IP_API_URL = "http://ip-api.com/json/{ip}?fields=66846719"
 
+# Кэшируем успешные ответы: security-события часто идут с одних и тех же IP.
+# Гео-данные IP меняются редко — держим их сутки (в процессе и в Redis)
+GEO_CACHE_MAX_SIZE = 8192
+GEO_CACHE_TTL = 86400  # секунд
+GEO_REDIS_KEY = "geoip:{ip}"
+_geo_cache: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+# Общий клиент: пул соединений переиспользуется между запросами
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=2.0)
+    return _http_client
+
+
+async def close_geo_client():
+    """Закрывает общий HTTP-клиент (при остановке приложения)"""
+    global _http_client
+    client, _http_client = _http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def _cache_get(ip: str) -> Optional[dict]:
+    entry = _geo_cache.get(ip)
+    if entry is None:
+        return None
+    expires_at, result = entry
+    if expires_at < time.monotonic():
+        del _geo_cache[ip]
+        return None
+    _geo_cache.move_to_end(ip)
+    return dict(result)
+
+
+def _cache_set(ip: str, result: dict):
+    _geo_cache[ip] = (time.monotonic() + GEO_CACHE_TTL, dict(result))
+    _geo_cache.move_to_end(ip)
+    if len(_geo_cache) > GEO_CACHE_MAX_SIZE:
+        _geo_cache.popitem(last=False)
+
+
+async def _redis_get(ip: str) -> Optional[dict]:
+    try:
+        redis = await get_redis()
+        raw = await redis.get(GEO_REDIS_KEY.format(ip=ip))
+        cached = orjson.loads(raw) if raw else None
+    except Exception:
+        # Redis недоступен или значение повреждено — считаем промахом
+        return None
+    return cached if isinstance(cached, dict) else None
+
+
+async def _redis_set(ip: str, result: dict):
+    try:
+        redis = await get_redis()
+        await redis.setex(GEO_REDIS_KEY.format(ip=ip), GEO_CACHE_TTL, orjson.dumps(result))
+    except Exception:
+        pass
+
 
 async def resolve_geo(ip: str) -> dict:
     """
@@ -17,6 +87,15 @@ async def resolve_geo(ip: str) -> dict:
     - geo_mobile
     """
 
+    cached = _cache_get(ip)
+    if cached is not None:
+        return cached
+
+    cached = await _redis_get(ip)
+    if cached is not None:
+        _cache_set(ip, cached)
+        return cached
+
     result = {
         "geo_country": None,
         "geo_region": None,
@@ -30,9 +109,8 @@ async def resolve_geo(ip: str) -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=2.0) as client:
-            r = await client.get(IP_API_URL.format(ip=ip))
-            data = r.json()
+        r = await _get_http_client().get(IP_API_URL.format(ip=ip))
+        data = r.json()
 
         if data.get("status") != "success":
             return result
@@ -47,6 +125,9 @@ async def resolve_geo(ip: str) -> dict:
         result["geo_proxy"] = data.get("proxy")
         result["geo_mobile"] = data.get("mobile")
 
+        _cache_set(ip, result)
+        await _redis_set(ip, result)
+
     except Exception:
         pass
 
@@ -3,62 +3,221 @@
 """
 import logging
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from core.logging.formatters import EnhancedJSONFormatter
-import gzip
-import shutil
+import atexit
+import queue
 import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import zstandard
+
+# zstd сжимает в разы быстрее gzip при лучшем коэффициенте
+COMPRESSED_SUFFIX = ".zst"
+ZSTD_LEVEL = 3
+COPY_CHUNK_SIZE = 1 << 20  # 1 MiB
+# .pending старше этого считается брошенным завершившимся процессом
+PENDING_STALE_SECONDS = 60
+
+# Сжатие и сдвиг архивов — в одном фоновом потоке на все хендлеры:
+# задачи выполняются строго по очереди, поэтому сдвиги не пересекаются
+_rotation_executor: Optional[ThreadPoolExecutor] = None
+_rotation_executor_lock = threading.Lock()
+
+
+def _get_rotation_executor() -> ThreadPoolExecutor:
+    global _rotation_executor
+    with _rotation_executor_lock:
+        if _rotation_executor is None:
+            _rotation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-rotate")
+        return _rotation_executor
 
 
 class RotatingFileHandlerWithCompression(RotatingFileHandler):
-    """Rotating file handler that compresses old log files"""
+    """Rotating file handler that compresses old log files in the background"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Имена архивов не меняются между ротациями: индекс i -> "<base>.i<suffix>"
+        self._backup_names = tuple(
+            self.rotation_filename(f"{self.baseFilename}.{i}{COMPRESSED_SUFFIX}")
+            for i in range(self.backupCount + 1)
+        )
+        # Архивы прежнего хендлера — без суффикса: "<base>.1" не сжат, "<base>.2".. — gzip.
+        # Сдвигаются вместе с .zst и удаляются на последнем номере, пока не закончатся
+        self._legacy_names = tuple(
+            self.rotation_filename(f"{self.baseFilename}.{i}")
+            for i in range(self.backupCount + 1)
+        )
+        if self.backupCount > 0:
+            self._resume_pending()
+
+    def _resume_pending(self):
+        """
+        Досжимает .pending, оставшиеся от процесса, который завершился до
+        окончания фонового сжатия. Старые — первыми, чтобы свежий попал в .1
+        """
+        prefix = os.path.basename(self.baseFilename) + "."
+        # Свежие .pending может ещё сжимать другой живой воркер (rename обновляет ctime)
+        cutoff = time.time() - PENDING_STALE_SECONDS
+        try:
+            leftovers = sorted(
+                (int(stamp), entry.path)
+                for entry in os.scandir(os.path.dirname(self.baseFilename))
+                if entry.name.startswith(prefix) and entry.name.endswith(".pending")
+                for stamp in [entry.name[len(prefix):-len(".pending")]]
+                if stamp.isdigit() and entry.stat().st_ctime < cutoff
+            )
+        except OSError as e:
+            logging.error(f"Failed to scan pending backups of {self.baseFilename}: {e}")
+            return
+
+        for _, path in leftovers:
+            # Переименование забирает файл себе: воркер, стартующий параллельно, его не получит
+            claimed = f"{self.baseFilename}.{time.time_ns()}.pending"
+            try:
+                os.rename(path, claimed)
+            except FileNotFoundError:
+                continue
+            _get_rotation_executor().submit(self._compress_and_shift, claimed)
+
+    def _open(self):
+        # Пишем готовые UTF-8 байты от форматтера, без TextIOWrapper
+        return open(self.baseFilename, "ab")
+
+    def emit(self, record: logging.LogRecord):
+        """
+        Один проход на запись: форматируем один раз в bytes (orjson через
+        format_bytes), по длине решаем о ротации и пишем. Базовый
+        shouldRollover форматировал запись повторно и делал два stat().
+        """
+        try:
+            format_bytes = getattr(self.formatter, "format_bytes", None)
+            if format_bytes is not None:
+                data = format_bytes(record) + b"\n"
+            else:
+                data = (self.format(record) + "\n").encode("utf-8")
+
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0:
+                pos = self.stream.tell()
+                if pos and pos + len(data) >= self.maxBytes:
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+
+            self.stream.write(data)
+            self.stream.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
     def doRollover(self):
         if self.stream:
             self.stream.close()
             self.stream = None
 
+        # В потоке логирования — только переименование и новый файл
         if self.backupCount > 0:
-            for i in range(self.backupCount - 1, 0, -1):
-                sfn = self.rotation_filename(f"{self.baseFilename}.{i}")
-                dfn = self.rotation_filename(f"{self.baseFilename}.{i + 1}")
-
-                if os.path.exists(sfn):
-                    if not sfn.endswith(".gz"):
-                        compressed_sfn = sfn + ".gz"
-                        self._compress_file(sfn, compressed_sfn)
-                        sfn = compressed_sfn
-
-                    if os.path.exists(dfn):
-                        os.remove(dfn)
-                    os.rename(sfn, dfn)
-
-            dfn = self.rotation_filename(self.baseFilename + ".1")
-            if os.path.exists(dfn):
-                os.remove(dfn)
-            if os.path.exists(self.baseFilename):
-                os.rename(self.baseFilename, dfn)
+            pending = f"{self.baseFilename}.{time.time_ns()}.pending"
+            try:
+                os.rename(self.baseFilename, pending)
+            except FileNotFoundError:
+                pass
+            else:
+                try:
+                    _get_rotation_executor().submit(self._compress_and_shift, pending)
+                except RuntimeError:
+                    # Пул уже остановлен (завершение интерпретатора) — сжимаем сами
+                    self._compress_and_shift(pending)
 
         if not self.delay:
             self.stream = self._open()
 
+    def _compress_and_shift(self, pending: str):
+        """Сдвигает сжатые архивы на номер и сжимает pending в .1 (фоновый поток)"""
+        try:
+            names = self._backup_names
+            # Один проход по каталогу вместо попытки replace на каждый номер
+            existing = {entry.name for entry in os.scandir(os.path.dirname(self.baseFilename))}
+            for i in range(self.backupCount, 0, -1):
+                for backups in (names, self._legacy_names):
+                    sfn = backups[i]
+                    if os.path.basename(sfn) not in existing:
+                        continue
+
+                    if i == self.backupCount:
+                        # Старые архивы за пределами backupCount больше никто не перезапишет
+                        if backups is not names:
+                            try:
+                                os.remove(sfn)
+                            except FileNotFoundError:
+                                pass
+                        continue
+                    dfn = backups[i + 1]
+
+                    # Одна атомарная операция вместо exists/remove/rename
+                    try:
+                        os.replace(sfn, dfn)
+                    except FileNotFoundError:
+                        pass
+                    existing.discard(os.path.basename(sfn))
+                    existing.add(os.path.basename(dfn))
+        except Exception as e:
+            logging.error(f"Failed to shift backups of {self.baseFilename}: {e}")
+
+        self._compress_file(pending, self._backup_names[1])
+
     def _compress_file(self, source: str, dest: str):
         try:
-            with open(source, "rb") as f_in:
-                with gzip.open(dest, "wb") as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL, threads=-1)
+            with open(source, "rb") as f_in, open(dest, "wb") as f_out:
+                cctx.copy_stream(f_in, f_out, read_size=COPY_CHUNK_SIZE, write_size=COPY_CHUNK_SIZE)
             os.remove(source)
         except Exception as e:
             logging.error(f"Failed to compress {source}: {e}")
 
 
-class LoggerNameFilter(logging.Filter):
-    def __init__(self, logger_name: str):
-        super().__init__()
-        self.logger_name = logger_name
+class InProcessQueueHandler(QueueHandler):
+    """QueueHandler for a QueueListener in the same process.
+
+    The stock prepare() formats the record on the caller's thread and replaces
+    dict messages with their str(); here the record is passed through as is,
+    so the target handler's formatter runs in the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def make_logger_name_filter(logger_name: str):
+    """Фильтр «только записи этого логгера» — обычная функция, без logging.Filter"""
+    logger_name = sys.intern(logger_name)
+    # Имена логгеров — интернированные литералы, обычно хватает сравнения по is
+    return lambda record: record.name is logger_name or record.name == logger_name
+
+
+def _queued(handler: logging.Handler, logger_name: str) -> QueueHandler:
+    """
+    Ставит файловый хендлер за очередь: вызывающий поток только кладёт запись
+    в SimpleQueue, форматирование и запись на диск — в потоке QueueListener
+    """
+    q = queue.SimpleQueue()
+    listener = QueueListener(q, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
 
-    def filter(self, record: logging.LogRecord) -> bool:
-        return record.name == self.logger_name
+    queue_handler = InProcessQueueHandler(q)
+    queue_handler.setLevel(handler.level)
+    # Чужие записи отсекаем ещё до очереди
+    queue_handler.addFilter(make_logger_name_filter(logger_name))
+    return queue_handler
 
 
 def setup_log_handlers(
@@ -77,26 +236,25 @@ def setup_log_handlers(
     
     handlers = {}
     handler_class = RotatingFileHandlerWithCompression if enable_compression else RotatingFileHandler
+    # Форматтер без состояния — один экземпляр на все хендлеры
+    formatter = EnhancedJSONFormatter()
     
     # App logger
     app_handler = handler_class(str(base / "app" / "app.log"), maxBytes=max_bytes, backupCount=backup_count)
-    app_handler.setFormatter(EnhancedJSONFormatter())
+    app_handler.setFormatter(formatter)
     app_handler.setLevel(logging.INFO)
-    app_handler.addFilter(LoggerNameFilter("app"))
-    handlers["app"] = app_handler
+    handlers["app"] = _queued(app_handler, "app")
     
     # Security logger
     security_handler = handler_class(str(base / "security" / "security.log"), maxBytes=max_bytes, backupCount=backup_count)
-    security_handler.setFormatter(EnhancedJSONFormatter())
+    security_handler.setFormatter(formatter)
     security_handler.setLevel(logging.WARNING)
-    security_handler.addFilter(LoggerNameFilter("security"))
-    handlers["security"] = security_handler
+    handlers["security"] = _queued(security_handler, "security")
     
     # System logger
     system_handler = handler_class(str(base / "system" / "system.log"), maxBytes=max_bytes, backupCount=backup_count)
-    system_handler.setFormatter(EnhancedJSONFormatter())
+    system_handler.setFormatter(formatter)
     system_handler.setLevel(logging.INFO)
-    system_handler.addFilter(LoggerNameFilter("system"))
-    handlers["system"] = system_handler
+    handlers["system"] = _queued(system_handler, "system")
     
     return handlers
\ No newline at end of file
@@ -7,6 +7,60 @@
 
 logger = logging.getLogger("app")
 
+# Кеш проверенных claims по токену: повторные запросы с тем же токеном
+# не платят за HMAC-проверку. Храним и отрицательный результат (None).
+_CLAIMS_CACHE_TTL_SEC = 60
+_CLAIMS_CACHE_MAX_SIZE = 1024
+_claims_cache: dict = {}
+
+
+def _decode_claims_cached(token: str):
+    """Claims access-токена (или None, если токен невалиден) с кешем на TTL"""
+    now = time.time()
+    cached = _claims_cache.get(token)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        payload = None
+
+    expires = now + _CLAIMS_CACHE_TTL_SEC
+    if payload is not None and isinstance(payload.get("exp"), (int, float)):
+        # Не держим claims в кеше дольше срока жизни токена
+        expires = min(expires, payload["exp"])
+
+    if len(_claims_cache) >= _CLAIMS_CACHE_MAX_SIZE:
+        _claims_cache.clear()
+    _claims_cache[token] = (expires, payload)
+    return payload
+
+
+def _resolve_identity(request: Request):
+    """
+    (user_id, email) для строки лога.
+
+    Зависимости авторизации кладут проверенные claims в request.state.jwt_claims;
+    декодируем токен сами только если их не было (публичные эндпоинты).
+    """
+    payload = getattr(request.state, "jwt_claims", None)
+
+    if payload is None:
+        token = request.cookies.get("access_token")
+        if not token:
+            auth_header = request.headers.get("authorization")
+            if auth_header and auth_header.startswith("Bearer "):
+                token = auth_header.split(" ")[1]
+        if not token:
+            return None, None
+        payload = _decode_claims_cached(token)
+        if payload is None:
+            return None, None
+
+    user_id = payload.get("sub")
+    return (int(user_id) if user_id else None), payload.get("email")
+
 
 class AccessLogMiddleware(BaseHTTPMiddleware):
     """
@@ -18,25 +72,11 @@ async def dispatch(self, request: Request, call_next):
         client_ip = request.client.host if request.client else "unknown"
         user_agent = request.headers.get("user-agent", "-")
         
-        user_id = None
-        user_email = None
-        token = request.cookies.get("access_token")
-        if not token:
-            auth_header = request.headers.get("authorization")
-            if auth_header and auth_header.startswith("Bearer "):
-                token = auth_header.split(" ")[1]
-        
-        if token:
-            try:
-                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-                user_id = payload.get("sub")
-                user_email = payload.get("email")
-            except JWTError:
-                pass
-        
         try:
             response = await call_next(request)
             duration = round((time.time() - start) * 1000, 2)
+            # После call_next: claims уже могли положить зависимости авторизации
+            user_id, user_email = _resolve_identity(request)
 
             logger.info({
                 "event": "http_request",
@@ -47,7 +87,7 @@ async def dispatch(self, request: Request, call_next):
                 "duration_ms": duration,
                 "ip": client_ip,
                 "user_agent": user_agent,
-                "user_id": int(user_id) if user_id else None,
+                "user_id": user_id,
                 "email": user_email,
             })
             
@@ -61,7 +101,7 @@ async def dispatch(self, request: Request, call_next):
                     duration=duration / 1000
                 )
             except Exception as metric_error:
-                logger.debug(f"Failed to record metrics: {metric_error}")
+                logger.debug("Failed to record metrics: %s", metric_error)
 
             if request_id:
                 response.headers["X-Request-ID"] = request_id
@@ -70,6 +110,7 @@ async def dispatch(self, request: Request, call_next):
         
         except Exception as e:
             duration = round((time.time() - start) * 1000, 2)
+            user_id, user_email = _resolve_identity(request)
             
             logger.error({
                 "event": "http_request_error",
@@ -79,7 +120,7 @@ async def dispatch(self, request: Request, call_next):
                 "duration_ms": duration,
                 "ip": client_ip,
                 "user_agent": user_agent,
-                "user_id": int(user_id) if user_id else None,
+                "user_id": user_id,
                 "email": user_email,
                 "error": str(e),
                 "error_type": type(e).__name__,
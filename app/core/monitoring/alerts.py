@@ -3,13 +3,17 @@
 """
 from dataclasses import dataclass, field
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from typing import Optional, Dict, List
 from collections import deque
 import uuid
 import logging
+import time
 import asyncio
 
+from core.config import settings
+from core.monitoring.metrics import record_security_event
+
 logger = logging.getLogger("app")
 
 
@@ -21,6 +25,15 @@ class AlertSeverity(str, Enum):
     CRITICAL = "critical"
 
 
+# Severity order for the minimum-severity floor
+_SEVERITY_RANK = {
+    AlertSeverity.LOW: 0,
+    AlertSeverity.MEDIUM: 1,
+    AlertSeverity.HIGH: 2,
+    AlertSeverity.CRITICAL: 3,
+}
+
+
 class AlertType(str, Enum):
     """Types of security alerts"""
     MULTIPLE_FAILED_LOGINS = "multiple_failed_logins"
@@ -34,11 +47,11 @@ class AlertType(str, Enum):
     ACCOUNT_LOCKOUT = "account_lockout"
 
 
-@dataclass
+@dataclass(slots=True)
 class Alert:
-    """Security alert data structure"""
+    """Security alert data structure (slotted: no per-instance __dict__)"""
     id: str
-    timestamp: datetime
+    timestamp: float  # Unix epoch seconds (UTC)
     severity: AlertSeverity
     type: AlertType
     message: str
@@ -46,8 +59,20 @@ class Alert:
     ip_address: str
     details: Dict
     resolved: bool = False
-    resolved_at: Optional[datetime] = None
+    resolved_at: Optional[float] = None  # Unix epoch seconds (UTC)
     resolved_by: Optional[int] = None
+    
+    @property
+    def timestamp_dt(self) -> datetime:
+        """Creation time as an aware UTC datetime, for display and serialization"""
+        return datetime.fromtimestamp(self.timestamp, tz=timezone.utc)
+    
+    @property
+    def resolved_at_dt(self) -> Optional[datetime]:
+        """Resolution time as an aware UTC datetime, or None if unresolved"""
+        if self.resolved_at is None:
+            return None
+        return datetime.fromtimestamp(self.resolved_at, tz=timezone.utc)
 
 
 class AlertManager:
@@ -56,20 +81,44 @@ class AlertManager:
     Keeps last 1000 alerts or 24 hours, whichever is reached first
     """
     
-    def __init__(self, max_alerts: int = 1000, retention_hours: int = 24):
+    def __init__(
+        self,
+        max_alerts: int = 1000,
+        retention_hours: int = 24,
+        min_severity: AlertSeverity = AlertSeverity.LOW
+    ):
         """
         Initialize alert manager
         
         Args:
             max_alerts: Maximum number of alerts to keep in memory
             retention_hours: Hours to retain alerts
+            min_severity: Alerts below this severity are not created
         """
         self.max_alerts = max_alerts
         self.retention_hours = retention_hours
+        self.min_severity = AlertSeverity(min_severity)
         self.alerts: deque = deque(maxlen=max_alerts)
         self._lock = asyncio.Lock()
+        # Index of the alerts currently in the deque, by id
+        self._by_id: Dict[str, Alert] = {}
+        # Running counts of unresolved alerts, kept in sync on every change
+        self._counts: Dict[str, int] = {
+            "unresolved": 0,
+            "low": 0,
+            "medium": 0,
+            "high": 0,
+            "critical": 0,
+        }
         
-        logger.info(f"AlertManager initialized: max_alerts={max_alerts}, retention_hours={retention_hours}")
+        logger.info(
+            f"AlertManager initialized: max_alerts={max_alerts}, retention_hours={retention_hours}, "
+            f"min_severity={self.min_severity.value}"
+        )
+    
+    def enabled_for(self, severity: AlertSeverity) -> bool:
+        """Whether alerts of this severity are created (cheap, no lock)"""
+        return _SEVERITY_RANK[AlertSeverity(severity)] >= _SEVERITY_RANK[self.min_severity]
     
     async def create_alert(
         self,
@@ -79,7 +128,7 @@ async def create_alert(
         user_id: Optional[int],
         ip_address: str,
         details: Dict
-    ) -> Alert:
+    ) -> Optional[Alert]:
         """
         Create and store a new security alert
         
@@ -92,11 +141,14 @@ async def create_alert(
             details: Additional context about the alert
             
         Returns:
-            Created Alert object
+            Created Alert object, or None if severity is below min_severity
         """
+        if not self.enabled_for(severity):
+            return None
+        
         alert = Alert(
             id=str(uuid.uuid4()),
-            timestamp=datetime.utcnow(),
+            timestamp=time.time(),
             severity=severity,
             type=alert_type,
             message=message,
@@ -106,7 +158,13 @@ async def create_alert(
         )
         
         async with self._lock:
+            # A full deque evicts its oldest alert on append
+            if len(self.alerts) == self.alerts.maxlen:
+                self._forget(self.alerts[0])
             self.alerts.append(alert)
+            self._by_id[alert.id] = alert
+            self._counts["unresolved"] += 1
+            self._counts[severity.value] += 1
             self._cleanup_old_alerts()
         
         # Log alert creation
@@ -122,7 +180,6 @@ async def create_alert(
         })
         
         # Record metric
-        from core.monitoring.metrics import record_security_event
         record_security_event(alert_type.value)
         
         return alert
@@ -148,27 +205,36 @@ async def get_recent_alerts(
         Returns:
             List of filtered alerts, newest first
         """
-        async with self._lock:
-            alerts = list(self.alerts)
+        if limit <= 0:
+            return []
         
-        # Apply filters
-        if hours:
-            cutoff = datetime.utcnow() - timedelta(hours=hours)
-            alerts = [a for a in alerts if a.timestamp >= cutoff]
+        cutoff = time.time() - hours * 3600 if hours else None
         
+        # Normalize to Enum members once so the loop can compare by identity
         if severity:
-            alerts = [a for a in alerts if a.severity == severity]
-        
+            severity = AlertSeverity(severity)
         if alert_type:
-            alerts = [a for a in alerts if a.type == alert_type]
+            alert_type = AlertType(alert_type)
         
-        if resolved is not None:
-            alerts = [a for a in alerts if a.resolved == resolved]
+        # The deque is appended in time order: walk it newest first and stop
+        # at the limit or at the first alert older than the cutoff, no sort.
+        # No lock and no copy: nothing below awaits, so no writer can run
+        # on the event loop while the deque is being iterated
+        result = []
+        for a in reversed(self.alerts):
+            if cutoff is not None and a.timestamp < cutoff:
+                break
+            if severity and a.severity is not severity:
+                continue
+            if alert_type and a.type is not alert_type:
+                continue
+            if resolved is not None and a.resolved != resolved:
+                continue
+            result.append(a)
+            if len(result) == limit:
+                break
         
-        # Sort by timestamp descending (newest first)
-        alerts.sort(key=lambda a: a.timestamp, reverse=True)
-        
-        return alerts[:limit]
+        return result
     
     async def get_alert_by_id(self, alert_id: str) -> Optional[Alert]:
         """
@@ -180,11 +246,7 @@ async def get_alert_by_id(self, alert_id: str) -> Optional[Alert]:
         Returns:
             Alert if found, None otherwise
         """
-        async with self._lock:
-            for alert in self.alerts:
-                if alert.id == alert_id:
-                    return alert
-        return None
+        return self._by_id.get(alert_id)
     
     async def resolve_alert(self, alert_id: str, resolved_by: Optional[int] = None) -> bool:
         """
@@ -198,51 +260,52 @@ async def resolve_alert(self, alert_id: str, resolved_by: Optional[int] = None)
             True if alert was found and resolved, False otherwise
         """
         async with self._lock:
-            for alert in self.alerts:
-                if alert.id == alert_id and not alert.resolved:
-                    alert.resolved = True
-                    alert.resolved_at = datetime.utcnow()
-                    alert.resolved_by = resolved_by
-                    
-                    logger.info({
-                        "event": "alert_resolved",
-                        "alert_id": alert_id,
-                        "resolved_by": resolved_by,
-                        "alert_type": alert.type.value
-                    })
-                    return True
+            alert = self._by_id.get(alert_id)
+            if alert is not None and not alert.resolved:
+                alert.resolved = True
+                alert.resolved_at = time.time()
+                alert.resolved_by = resolved_by
+                self._counts["unresolved"] -= 1
+                self._counts[alert.severity.value] -= 1
+                
+                logger.info({
+                    "event": "alert_resolved",
+                    "alert_id": alert_id,
+                    "resolved_by": resolved_by,
+                    "alert_type": alert.type.value
+                })
+                return True
         return False
     
     async def get_alert_counts(self) -> Dict[str, int]:
         """
-        Get counts of alerts by severity
+        Get counts of alerts by severity (O(1), from running counters)
         
         Returns:
             Dictionary with counts by severity level
         """
-        async with self._lock:
-            counts = {
-                "total": len(self.alerts),
-                "unresolved": sum(1 for a in self.alerts if not a.resolved),
-                "low": sum(1 for a in self.alerts if a.severity == AlertSeverity.LOW and not a.resolved),
-                "medium": sum(1 for a in self.alerts if a.severity == AlertSeverity.MEDIUM and not a.resolved),
-                "high": sum(1 for a in self.alerts if a.severity == AlertSeverity.HIGH and not a.resolved),
-                "critical": sum(1 for a in self.alerts if a.severity == AlertSeverity.CRITICAL and not a.resolved),
-            }
-        return counts
+        return {"total": len(self.alerts), **self._counts}
+    
+    def _forget(self, alert: Alert):
+        """Drop an alert leaving the deque from the id index and running counts"""
+        del self._by_id[alert.id]
+        if not alert.resolved:
+            self._counts["unresolved"] -= 1
+            self._counts[alert.severity.value] -= 1
     
     def _cleanup_old_alerts(self):
         """Remove alerts older than retention period"""
-        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        cutoff = time.time() - self.retention_hours * 3600
         
         # Remove from the left (oldest) while they're too old
         while self.alerts and self.alerts[0].timestamp < cutoff:
             removed = self.alerts.popleft()
-            logger.debug(f"Removed old alert: {removed.id} from {removed.timestamp}")
+            self._forget(removed)
+            logger.debug("Removed old alert: %s from %s", removed.id, removed.timestamp)
 
 
 # Global alert manager instance
-alert_manager = AlertManager()
+alert_manager = AlertManager(min_severity=AlertSeverity(settings.ALERT_MIN_SEVERITY))
 
 
 # Convenience functions
@@ -253,13 +316,18 @@ async def create_alert(
     user_id: Optional[int],
     ip_address: str,
     details: Dict
-) -> Alert:
+) -> Optional[Alert]:
     """Create a new security alert"""
     return await alert_manager.create_alert(
         severity, alert_type, message, user_id, ip_address, details
     )
 
 
+def is_severity_enabled(severity: AlertSeverity) -> bool:
+    """Check before building an alert whether it would be created at all"""
+    return alert_manager.enabled_for(severity)
+
+
 async def get_recent_alerts(
     limit: int = 100,
     severity: Optional[AlertSeverity] = None,
@@ -1,16 +1,52 @@
 """
 Security anomaly detection and login attempt tracking
 """
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from typing import Optional, Dict, List, Any
 import redis.asyncio as redis
+from redis.exceptions import NoScriptError, ResponseError
 import logging
-import json
+import time
+import orjson
 
-from core.monitoring.alerts import create_alert, AlertSeverity, AlertType
+from core.monitoring.alerts import create_alert, is_severity_enabled, AlertSeverity, AlertType
+from core.monitoring.metrics import record_auth_attempt
 
 logger = logging.getLogger("app")
 
+# Запись неудачной попытки сразу в оба sorted set (по IP и по email) за один
+# round-trip и атомарно: ZADD + чистка по времени и по числу + EXPIRE + подсчёт.
+# При достижении порога SET NX ставит флаг «алерт отправлен» на время окна —
+# алерт создаётся один раз на пересечение порога, а не на каждую попытку.
+# KEYS = {ip_key, email_key, ip_fired_key, email_fired_key}
+# ARGV = {now, retention_cutoff, count_cutoff, ttl, ip_member, email_member, threshold, window}
+# Возвращает {ip_count, email_count, ip_fire, email_fire}
+RECORD_FAILED_ATTEMPT_LUA = """
+local result = {}
+for i = 1, 2 do
+    local key = KEYS[i]
+    redis.call('ZADD', key, ARGV[1], ARGV[4 + i])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', ARGV[2])
+    redis.call('ZREMRANGEBYRANK', key, 0, -101)
+    redis.call('EXPIRE', key, ARGV[4])
+    local count = redis.call('ZCOUNT', key, ARGV[3], '+inf')
+    result[i] = count
+    result[i + 2] = 0
+    if count >= tonumber(ARGV[7]) and redis.call('SET', KEYS[i + 2], 1, 'NX', 'EX', ARGV[8]) then
+        result[i + 2] = 1
+    end
+end
+return result
+"""
+
+# SHA скрипта — загружается в init_login_tracker
+_SCRIPT_SHA: Optional[str] = None
+
+
+def _utc_isoformat(ts: float) -> str:
+    """ISO-строка UTC без таймзоны (как datetime.utcnow().isoformat()) — только для алертов"""
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat()
+
 
 class LoginAttemptTracker:
     """
@@ -30,6 +66,11 @@ def __init__(self, redis_client: redis.Redis):
         self.brute_force_window_minutes = 5  # Time window for counting
         self.new_ip_retention_days = 30  # Track IPs for 30 days
         
+        # Окна в секундах — считаются один раз, а не на каждую попытку
+        self._window_seconds = self.brute_force_window_minutes * 60
+        self._ttl_seconds = self._window_seconds * 2  # Keep/expire after 2x window
+        self._ip_retention_seconds = self.new_ip_retention_days * 24 * 60 * 60
+        
         logger.debug("LoginAttemptTracker initialized")
     
     async def record_attempt(self, email: str, ip: str, success: bool, user_id: Optional[int] = None) -> None:
@@ -42,70 +83,74 @@ async def record_attempt(self, email: str, ip: str, success: bool, user_id: Opti
             success: Whether login was successful
             user_id: User ID if login succeeded
         """
-        timestamp = datetime.utcnow().isoformat()
+        now = time.time()
         
         # Record metrics
-        from core.monitoring.metrics import record_auth_attempt
-        record_auth_attempt(email, success)
+        record_auth_attempt(success)
         
         if success:
             # Clear failed attempts on successful login
             await self._clear_failed_attempts(email, ip)
             
-            # Check if this is a new IP for the user
-            is_new_ip = await self.is_new_ip_for_user(email, ip)
-            if is_new_ip and user_id:
+            # Check if this is a new IP for the user — only if it would be logged or alerted
+            log_enabled = logger.isEnabledFor(logging.WARNING)
+            alert_enabled = is_severity_enabled(AlertSeverity.MEDIUM)
+            if user_id and (log_enabled or alert_enabled) and await self.is_new_ip_for_user(email, ip):
                 # Log warning and create alert
-                logger.warning({
-                    "event": "new_ip_login",
-                    "email": email,
-                    "ip": ip,
-                    "user_id": user_id
-                })
-                
-                await create_alert(
-                    severity=AlertSeverity.MEDIUM,
-                    alert_type=AlertType.NEW_IP_LOGIN,
-                    message=f"User {email} logged in from new IP address",
-                    user_id=user_id,
-                    ip_address=ip,
-                    details={
+                if log_enabled:
+                    logger.warning({
+                        "event": "new_ip_login",
                         "email": email,
-                        "timestamp": timestamp
-                    }
-                )
+                        "ip": ip,
+                        "user_id": user_id
+                    })
+                
+                if alert_enabled:
+                    await create_alert(
+                        severity=AlertSeverity.MEDIUM,
+                        alert_type=AlertType.NEW_IP_LOGIN,
+                        message=f"User {email} logged in from new IP address",
+                        user_id=user_id,
+                        ip_address=ip,
+                        details={
+                            "email": email,
+                            "timestamp": _utc_isoformat(now)
+                        }
+                    )
             
             # Store successful login IP
             await self._record_user_ip(email, ip)
         else:
-            # Record failed attempt
-            await self._record_failed_attempt(email, ip, timestamp)
+            # Record failed attempt and get counts in the window (one round-trip)
+            ip_failed_count, user_failed_count, ip_fire, email_fire = await self._record_failed_attempt(
+                email, ip, now
+            )
             
-            # Check for brute force
-            is_brute_force = await self.check_brute_force(ip)
-            if is_brute_force:
-                logger.warning({
-                    "event": "brute_force_detected",
-                    "email": email,
-                    "ip": ip
-                })
-                
-                await create_alert(
-                    severity=AlertSeverity.HIGH,
-                    alert_type=AlertType.BRUTE_FORCE_ATTEMPT,
-                    message=f"Brute force attack detected from IP {ip}",
-                    user_id=None,
-                    ip_address=ip,
-                    details={
+            # Check for brute force (alert once per window when the threshold is crossed)
+            if ip_fire:
+                if logger.isEnabledFor(logging.WARNING):
+                    logger.warning({
+                        "event": "brute_force_detected",
                         "email": email,
-                        "failed_attempts": await self.get_failed_attempts_count(ip),
-                        "timestamp": timestamp
-                    }
-                )
+                        "ip": ip
+                    })
+                
+                if is_severity_enabled(AlertSeverity.HIGH):
+                    await create_alert(
+                        severity=AlertSeverity.HIGH,
+                        alert_type=AlertType.BRUTE_FORCE_ATTEMPT,
+                        message=f"Brute force attack detected from IP {ip}",
+                        user_id=None,
+                        ip_address=ip,
+                        details={
+                            "email": email,
+                            "failed_attempts": ip_failed_count,
+                            "timestamp": _utc_isoformat(now)
+                        }
+                    )
             
             # Check for multiple failed logins for this user
-            user_failed_count = await self.get_failed_attempts(email, minutes=5)
-            if user_failed_count >= self.brute_force_threshold:
+            if email_fire and is_severity_enabled(AlertSeverity.HIGH):
                 await create_alert(
                     severity=AlertSeverity.HIGH,
                     alert_type=AlertType.MULTIPLE_FAILED_LOGINS,
@@ -115,8 +160,8 @@ async def record_attempt(self, email: str, ip: str, success: bool, user_id: Opti
                     details={
                         "email": email,
                         "failed_attempts": user_failed_count,
-                        "time_window_minutes": 5,
-                        "timestamp": timestamp
+                        "time_window_minutes": self.brute_force_window_minutes,
+                        "timestamp": _utc_isoformat(now)
                     }
                 )
     
@@ -144,18 +189,11 @@ async def get_failed_attempts_count(self, ip: str) -> int:
             Number of failed attempts
         """
         key = f"failed_attempts:ip:{ip}"
-        attempts_json = await self.redis.get(key)
-        
-        if not attempts_json:
-            return 0
+        cutoff = time.time() - self._window_seconds
         
         try:
-            attempts = json.loads(attempts_json)
-            cutoff = (datetime.utcnow() - timedelta(minutes=self.brute_force_window_minutes)).isoformat()
-            
-            # Count attempts within window
-            recent = [a for a in attempts if a['timestamp'] >= cutoff]
-            return len(recent)
+            # Попытки хранятся в sorted set со score = unix time — считаем на стороне Redis
+            return await self.redis.zcount(key, cutoff, "+inf")
         except Exception as e:
             logger.error(f"Error counting failed attempts: {e}")
             return 0
@@ -172,18 +210,10 @@ async def get_failed_attempts(self, email: str, minutes: int = 5) -> int:
             Number of failed attempts in time window
         """
         key = f"failed_attempts:email:{email}"
-        attempts_json = await self.redis.get(key)
-        
-        if not attempts_json:
-            return 0
+        cutoff = time.time() - minutes * 60
         
         try:
-            attempts = json.loads(attempts_json)
-            cutoff = (datetime.utcnow() - timedelta(minutes=minutes)).isoformat()
-            
-            # Count attempts within window
-            recent = [a for a in attempts if a['timestamp'] >= cutoff]
-            return len(recent)
+            return await self.redis.zcount(key, cutoff, "+inf")
         except Exception as e:
             logger.error(f"Error counting failed attempts for user: {e}")
             return 0
@@ -200,17 +230,14 @@ async def is_new_ip_for_user(self, email: str, ip: str) -> bool:
             True if IP is new, False if seen before
         """
         key = f"user_ips:{email}"
-        ips_json = await self.redis.get(key)
-        
-        if not ips_json:
-            return True
         
         try:
-            ips = json.loads(ips_json)
-            return ip not in ips
-        except Exception as e:
-            logger.error(f"Error checking IP history: {e}")
-            return False
+            # IP пользователя — sorted set (score = время последнего входа с IP)
+            return await self.redis.zscore(key, ip) is None
+        except ResponseError:
+            # Ключ ещё в старом формате (JSON-список) — переводим в sorted set
+            await self._migrate_user_ips(key)
+            return await self.redis.zscore(key, ip) is None
     
     async def check_suspicious_activity(self, email: str, ip: str) -> Dict[str, Any]:
         """
@@ -223,85 +250,116 @@ async def check_suspicious_activity(self, email: str, ip: str) -> Dict[str, Any]
         Returns:
             Dictionary with suspicious activity indicators
         """
-        return {
-            "brute_force": await self.check_brute_force(ip),
-            "multiple_failed_logins": await self.get_failed_attempts(email, 5) >= self.brute_force_threshold,
-            "new_ip": await self.is_new_ip_for_user(email, ip),
-            "ip_failed_attempts": await self.get_failed_attempts_count(ip),
-            "user_failed_attempts": await self.get_failed_attempts(email, 5)
-        }
-    
-    async def _record_failed_attempt(self, email: str, ip: str, timestamp: str):
-        """Record a failed login attempt"""
-        # Record by IP
-        ip_key = f"failed_attempts:ip:{ip}"
-        await self._append_attempt(ip_key, {"email": email, "timestamp": timestamp})
+        cutoff = time.time() - self._window_seconds
         
-        # Record by email
-        email_key = f"failed_attempts:email:{email}"
-        await self._append_attempt(email_key, {"ip": ip, "timestamp": timestamp})
-    
-    async def _append_attempt(self, key: str, attempt: Dict):
-        """Append an attempt to the list in Redis"""
-        attempts_json = await self.redis.get(key)
+        # Все три запроса — одним pipeline, один round-trip
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcount(f"failed_attempts:ip:{ip}", cutoff, "+inf")
+            pipe.zcount(f"failed_attempts:email:{email}", cutoff, "+inf")
+            pipe.zscore(f"user_ips:{email}", ip)
+            ip_failed, user_failed, ip_seen = await pipe.execute(raise_on_error=False)
         
-        if attempts_json:
-            try:
-                attempts = json.loads(attempts_json)
-            except Exception:
-                attempts = []
+        if isinstance(ip_failed, Exception):
+            logger.error(f"Error counting failed attempts: {ip_failed}")
+            ip_failed = 0
+        if isinstance(user_failed, Exception):
+            logger.error(f"Error counting failed attempts for user: {user_failed}")
+            user_failed = 0
+        if isinstance(ip_seen, ResponseError):
+            # История IP в старом формате — проверка с миграцией
+            new_ip = await self.is_new_ip_for_user(email, ip)
         else:
-            attempts = []
+            new_ip = ip_seen is None
         
-        # Add new attempt
-        attempts.append(attempt)
+        return {
+            "brute_force": ip_failed >= self.brute_force_threshold,
+            "multiple_failed_logins": user_failed >= self.brute_force_threshold,
+            "new_ip": new_ip,
+            "ip_failed_attempts": ip_failed,
+            "user_failed_attempts": user_failed
+        }
+    
+    async def _record_failed_attempt(self, email: str, ip: str, now: float) -> tuple[int, int, bool, bool]:
+        """
+        Record a failed login attempt by IP and by email
         
-        # Keep only last 100 attempts or attempts within window
-        cutoff = (datetime.utcnow() - timedelta(minutes=self.brute_force_window_minutes * 2)).isoformat()
-        attempts = [a for a in attempts if a['timestamp'] >= cutoff][-100:]
+        Returns:
+            (failed attempts from IP, failed attempts for email) in the window and
+            whether the IP / email alert should fire now
+        """
+        global _SCRIPT_SHA
+        keys = (
+            f"failed_attempts:ip:{ip}",
+            f"failed_attempts:email:{email}",
+            f"alert_fired:ip:{ip}",
+            f"alert_fired:email:{email}",
+        )
         
-        # Store back
-        await self.redis.set(
-            key,
-            json.dumps(attempts),
-            ex=self.brute_force_window_minutes * 60 * 2  # Expire after 2x window
+        args = (
+            now,
+            now - self._ttl_seconds,  # Keep attempts within 2x window
+            now - self._window_seconds,
+            self._ttl_seconds,  # Expire after 2x window
+            f"{now}:{email}",
+            f"{now}:{ip}",
+            self.brute_force_threshold,
+            self._window_seconds,
         )
+        
+        if _SCRIPT_SHA is None:
+            _SCRIPT_SHA = await self.redis.script_load(RECORD_FAILED_ATTEMPT_LUA)
+        try:
+            result = await self.redis.evalsha(_SCRIPT_SHA, len(keys), *keys, *args)
+        except NoScriptError:
+            # Кэш скриптов сброшен (рестарт Redis, SCRIPT FLUSH) — загружаем заново
+            _SCRIPT_SHA = await self.redis.script_load(RECORD_FAILED_ATTEMPT_LUA)
+            result = await self.redis.evalsha(_SCRIPT_SHA, len(keys), *keys, *args)
+        
+        ip_count, email_count, ip_fire, email_fire = result
+        return int(ip_count), int(email_count), ip_fire == 1, email_fire == 1
     
     async def _clear_failed_attempts(self, email: str, ip: str):
         """Clear failed attempts after successful login"""
         email_key = f"failed_attempts:email:{email}"
         ip_key = f"failed_attempts:ip:{ip}"
         
-        await self.redis.delete(email_key)
-        await self.redis.delete(ip_key)
+        # Один DEL на все ключи — один round-trip; флаги алертов сбрасываются,
+        # чтобы новая серия неудачных попыток снова подняла алерт
+        await self.redis.delete(email_key, ip_key, f"alert_fired:email:{email}", f"alert_fired:ip:{ip}")
     
     async def _record_user_ip(self, email: str, ip: str):
         """Record IP address for user"""
         key = f"user_ips:{email}"
+        
+        async with self.redis.pipeline(transaction=False) as pipe:
+            # Add IP or refresh its last-seen time
+            pipe.zadd(key, {ip: time.time()})
+            # Keep last 10 IPs
+            pipe.zremrangebyrank(key, 0, -11)
+            # Store with 30 day expiration
+            pipe.expire(key, self._ip_retention_seconds)
+            await pipe.execute()
+    
+    async def _migrate_user_ips(self, key: str):
+        """Convert a legacy JSON list of IPs into a sorted set, keeping order and TTL"""
         ips_json = await self.redis.get(key)
+        ttl = await self.redis.ttl(key)
         
-        if ips_json:
-            try:
-                ips = json.loads(ips_json)
-            except Exception:
-                ips = []
-        else:
+        try:
+            ips = orjson.loads(ips_json) if ips_json else []
+        except Exception as e:
+            logger.error(f"Error migrating IP history: {e}")
             ips = []
         
-        # Add IP if not already present
-        if ip not in ips:
-            ips.append(ip)
-        
-        # Keep last 10 IPs
-        ips = ips[-10:]
-        
-        # Store with 30 day expiration
-        await self.redis.set(
-            key,
-            json.dumps(ips),
-            ex=self.new_ip_retention_days * 24 * 60 * 60
-        )
-
+        # Порядок списка сохраняем через score: последний IP — самый свежий
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(key)
+            if ips:
+                pipe.zadd(key, {ip: now - len(ips) + i for i, ip in enumerate(ips)})
+                if ttl > 0:
+                    pipe.expire(key, ttl)
+            await pipe.execute()
 
 # Global instance placeholder (will be initialized in main.py)
 login_tracker: Optional[LoginAttemptTracker] = None
@@ -316,6 +374,7 @@ def get_login_tracker() -> LoginAttemptTracker:
 
 async def init_login_tracker(redis_client: redis.Redis):
     """Initialize the global login tracker"""
-    global login_tracker
+    global login_tracker, _SCRIPT_SHA
+    _SCRIPT_SHA = await redis_client.script_load(RECORD_FAILED_ATTEMPT_LUA)
     login_tracker = LoginAttemptTracker(redis_client)
     logger.debug("Global LoginAttemptTracker initialized")
@@ -8,12 +8,37 @@
 import time
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import psutil
+from sqlalchemy import text
+
+from core.database import engine
+from core.redis import get_redis
 
 logger = logging.getLogger("app")
 
+# Immutable statement object, built once
+_HEALTH_QUERY = text("SELECT 1")
+
+# Same order of magnitude as the Redis ping timeout; a stuck DB check is reported as unhealthy
+DB_CHECK_TIMEOUT = 2.0  # seconds
+_db_check_future: Optional[asyncio.Future] = None
+
+# Probes poll /health every few seconds; results are reused for this long
+HEALTH_CACHE_TTL = 2.0  # seconds
+_health_cache: Dict[bool, tuple[float, Dict[str, Any]]] = {}
+_health_lock = asyncio.Lock()
+
+# Never change while the process runs
+_CPU_COUNT = psutil.cpu_count()
+_BOOT_TIME = datetime.fromtimestamp(psutil.boot_time())
+
+# CPU% is sampled in the background; requests only read the last value
+CPU_SAMPLE_INTERVAL = 2.0  # seconds
+_cpu_percent: Optional[float] = None
+_cpu_sampler_task: Optional[asyncio.Task] = None
+
 
 class HealthStatus(str, Enum):
     HEALTHY = "healthy"
@@ -29,15 +54,11 @@ class HealthStatus(str, Enum):
 def _check_database_sync() -> Dict[str, Any]:
     """Sync DB check executed inside a thread"""
     try:
-        from sqlalchemy import text
-
-        from core.database import engine
-
         start = time.time()
 
         # Sync engine → sync connect
         with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+            conn.execute(_HEALTH_QUERY)
 
         latency_ms = round((time.time() - start) * 1000, 2)
 
@@ -65,8 +86,23 @@ def _check_database_sync() -> Dict[str, Any]:
 
 
 async def check_database() -> Dict[str, Any]:
-    """Async wrapper for sync DB check"""
-    return await asyncio.to_thread(_check_database_sync)
+    """Async wrapper for sync DB check, bounded by DB_CHECK_TIMEOUT"""
+    global _db_check_future
+
+    # A thread can't be cancelled: while a timed-out check is still stuck,
+    # wait on it again instead of starting another thread
+    if _db_check_future is None or _db_check_future.done():
+        _db_check_future = asyncio.ensure_future(asyncio.to_thread(_check_database_sync))
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(_db_check_future), timeout=DB_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.error(f"Database health check timed out after {DB_CHECK_TIMEOUT}s")
+        return {
+            "status": HealthStatus.UNHEALTHY.value,
+            "error": "timeout",
+            "message": "Database health check timed out",
+        }
 
 
 # ============================================================
@@ -79,8 +115,6 @@ async def check_redis() -> Dict[str, Any]:
 
     for attempt in range(2):
         try:
-            from core.redis import get_redis
-
             redis_client = await get_redis()
             start = time.time()
 
@@ -123,7 +157,7 @@ async def check_redis() -> Dict[str, Any]:
 
 async def check_disk_space(threshold_percent: int = 10) -> Dict[str, Any]:
     try:
-        usage = shutil.disk_usage("/")
+        usage = await asyncio.to_thread(shutil.disk_usage, "/")
 
         total_gb = usage.total / (1024**3)
         used_gb = usage.used / (1024**3)
@@ -162,7 +196,7 @@ async def check_disk_space(threshold_percent: int = 10) -> Dict[str, Any]:
 
 async def check_memory(threshold_percent: int = 20) -> Dict[str, Any]:
     try:
-        memory = psutil.virtual_memory()
+        memory = await asyncio.to_thread(psutil.virtual_memory)
 
         total_mb = memory.total / (1024**2)
         available_mb = memory.available / (1024**2)
@@ -199,26 +233,54 @@ async def check_memory(threshold_percent: int = 20) -> Dict[str, Any]:
 # ============================================================
 
 
+async def _cpu_sampler():
+    global _cpu_percent
+    while True:
+        await asyncio.sleep(CPU_SAMPLE_INTERVAL)
+        # interval=None: usage since the previous call, returns immediately
+        _cpu_percent = psutil.cpu_percent(interval=None)
+
+
+def start_cpu_sampler():
+    """Start background CPU sampling (on application startup)"""
+    global _cpu_sampler_task
+    if _cpu_sampler_task is None or _cpu_sampler_task.done():
+        # The first non-blocking call only sets the baseline
+        psutil.cpu_percent(interval=None)
+        _cpu_sampler_task = asyncio.create_task(_cpu_sampler())
+
+
+async def stop_cpu_sampler():
+    """Stop background CPU sampling"""
+    global _cpu_sampler_task
+    task, _cpu_sampler_task = _cpu_sampler_task, None
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
 async def get_system_info() -> Dict[str, Any]:
     try:
-        cpu_percent = psutil.cpu_percent(interval=0.1)
-        cpu_count = psutil.cpu_count()
+        # Without a running sampler fall back to usage since the previous call
+        cpu_percent = _cpu_percent if _cpu_percent is not None else psutil.cpu_percent(interval=None)
 
-        load_avg = psutil.getloadavg() if hasattr(psutil, "getloadavg") else (0, 0, 0)
+        load_avg = await asyncio.to_thread(psutil.getloadavg) if hasattr(psutil, "getloadavg") else (0, 0, 0)
 
-        boot_time = datetime.fromtimestamp(psutil.boot_time())
-        uptime = datetime.utcnow() - boot_time.replace(tzinfo=None)
+        uptime = datetime.utcnow() - _BOOT_TIME
 
         return {
             "cpu_percent": cpu_percent,
-            "cpu_count": cpu_count,
+            "cpu_count": _CPU_COUNT,
             "load_average": {
                 "1min": round(load_avg[0], 2),
                 "5min": round(load_avg[1], 2),
                 "15min": round(load_avg[2], 2),
             },
             "uptime_seconds": int(uptime.total_seconds()),
-            "boot_time": boot_time.isoformat(),
+            "boot_time": _BOOT_TIME.isoformat(),
         }
 
     except Exception as e:
@@ -232,6 +294,26 @@ async def get_system_info() -> Dict[str, Any]:
 
 
 async def check_health(detailed: bool = False) -> Dict[str, Any]:
+    """
+    Cached health check: concurrent callers within HEALTH_CACHE_TTL share
+    one run of the probes (separate cache slots for detailed and short)
+    """
+    cached = _health_cache.get(detailed)
+    if cached is not None and time.monotonic() - cached[0] < HEALTH_CACHE_TTL:
+        return cached[1]
+
+    async with _health_lock:
+        # Another caller may have refreshed the cache while we waited
+        cached = _health_cache.get(detailed)
+        if cached is not None and time.monotonic() - cached[0] < HEALTH_CACHE_TTL:
+            return cached[1]
+
+        result = await _run_health_check(detailed)
+        _health_cache[detailed] = (time.monotonic(), result)
+        return result
+
+
+async def _run_health_check(detailed: bool) -> Dict[str, Any]:
     checks = {}
 
     try:
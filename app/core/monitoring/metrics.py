@@ -4,9 +4,17 @@
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from typing import Optional
 import logging
+import re
 
 logger = logging.getLogger("app")
 
+# Dynamic path segments collapsed by _sanitize_endpoint
+_ID_SEGMENT_RE = re.compile(r'/\d+')
+_UUID_SEGMENT_RE = re.compile(
+    r'/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
+    re.IGNORECASE
+)
+
 # HTTP Request Metrics
 http_requests_total = Counter(
     'http_requests_total',
@@ -22,18 +30,22 @@
 )
 
 # Authentication Metrics
+# No per-user labels: every distinct email would be a new time series
 auth_attempts_total = Counter(
     'auth_attempts_total',
     'Total authentication attempts',
-    ['result', 'email']
+    ['result']
 )
 
 auth_failures_total = Counter(
     'auth_failures_total',
-    'Total authentication failures',
-    ['email']
+    'Total authentication failures'
 )
 
+# Label children resolved once instead of on every attempt
+_auth_attempts_success = auth_attempts_total.labels(result="success")
+_auth_attempts_failure = auth_attempts_total.labels(result="failure")
+
 # Session Metrics
 active_sessions_count = Gauge(
     'active_sessions_count',
@@ -96,26 +108,19 @@ def record_request(method: str, endpoint: str, status_code: int, duration: float
         logger.error(f"Failed to record request metrics: {e}")
 
 
-def record_auth_attempt(email: str, success: bool):
+def record_auth_attempt(success: bool):
     """
     Record authentication attempt
     
     Args:
-        email: User email attempting authentication
         success: Whether authentication was successful
     """
     try:
-        # Mask email for privacy
-        masked_email = _mask_email(email)
-        result = "success" if success else "failure"
-        
-        auth_attempts_total.labels(
-            result=result,
-            email=masked_email
-        ).inc()
-        
-        if not success:
-            auth_failures_total.labels(email=masked_email).inc()
+        if success:
+            _auth_attempts_success.inc()
+        else:
+            _auth_attempts_failure.inc()
+            auth_failures_total.inc()
     except Exception as e:
         logger.error(f"Failed to record auth attempt metrics: {e}")
 
@@ -221,46 +226,14 @@ def _sanitize_endpoint(endpoint: str) -> str:
     Returns:
         Sanitized endpoint path
     """
-    import re
-    
     # Replace numeric IDs with placeholder
-    endpoint = re.sub(r'/\d+', '/{id}', endpoint)
+    endpoint = _ID_SEGMENT_RE.sub('/{id}', endpoint)
     
     # Replace UUIDs with placeholder
-    endpoint = re.sub(
-        r'/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}',
-        '/{uuid}',
-        endpoint,
-        flags=re.IGNORECASE
-    )
+    endpoint = _UUID_SEGMENT_RE.sub('/{uuid}', endpoint)
     
     # Limit endpoint length
     if len(endpoint) > 100:
         endpoint = endpoint[:100] + '...'
     
     return endpoint
-
-
-def _mask_email(email: str) -> str:
-    """
-    Mask email address for privacy in metrics
-    
-    Args:
-        email: Email address to mask
-        
-    Returns:
-        Masked email (e.g., u***@example.com)
-    """
-    try:
-        if '@' not in email:
-            return 'invalid@email'
-        
-        local, domain = email.split('@', 1)
-        if len(local) <= 1:
-            masked_local = '*'
-        else:
-            masked_local = local[0] + '***'
-        
-        return f"{masked_local}@{domain}"
-    except Exception:
-        return 'unknown@email'
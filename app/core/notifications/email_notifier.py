@@ -172,7 +172,7 @@ def _format_alert_text(self, alert: Alert) -> str:
 
 Severity: {alert.severity.value.upper()}
 Type: {alert.type.value.replace('_', ' ').title()}
-Time: {alert.timestamp.strftime('%Y-%m-%d %H:%M:%S')} UTC
+Time: {alert.timestamp_dt.strftime('%Y-%m-%d %H:%M:%S')} UTC
 
 Message:
 {alert.message}
@@ -239,7 +239,7 @@ def _format_alert_html(self, alert: Alert) -> str:
         <div class="content">
             <div class="alert-info">
                 <h2>{alert.type.value.replace('_', ' ').title()}</h2>
-                <p><strong>Time:</strong> {alert.timestamp.strftime('%Y-%m-%d %H:%M:%S')} UTC</p>
+                <p><strong>Time:</strong> {alert.timestamp_dt.strftime('%Y-%m-%d %H:%M:%S')} UTC</p>
                 <p><strong>Message:</strong> {alert.message}</p>
             </div>
             
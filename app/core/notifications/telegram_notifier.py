@@ -100,7 +100,7 @@ def _format_alert(self, alert: Alert) -> str:
         severity_emoji = self._get_severity_emoji(alert.severity)
         
         # Format timestamp
-        time_str = alert.timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        time_str = alert.timestamp_dt.strftime('%Y-%m-%d %H:%M:%S')
         
         # Build message
         message = f"""
@@ -27,11 +27,22 @@ def _create_sync_client() -> redis.Redis:
     return redis.from_url(settings.REDIS_URL, **_build_common_kwargs())
 
 
+# Ждём свободное соединение из пула не дольше, чем подключение
+ASYNC_POOL_TIMEOUT = 5
+
+
 async def _create_async_client() -> aioredis.Redis:
-    client = await aioredis.from_url(
+    # Ограниченный пул: параллельные запросы берут разные соединения,
+    # а при всплеске ждут свободное, а не открывают новые без предела
+    pool = aioredis.BlockingConnectionPool.from_url(
         settings.REDIS_URL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=ASYNC_POOL_TIMEOUT,
+        health_check_interval=30,
         **_build_common_kwargs(),
     )
+    # from_pool: клиент владеет пулом и закрывает его в aclose()
+    client = aioredis.Redis.from_pool(pool)
     await asyncio.wait_for(client.ping(), timeout=1.0)
     return client
 
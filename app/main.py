@@ -1,13 +1,11 @@
 import asyncio
-import json
+import atexit
 import logging
 import logging.config
 import re
 from contextlib import asynccontextmanager
-from datetime import datetime
 from typing import Annotated
 
-import pytz
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.utils import get_openapi
@@ -22,6 +20,7 @@
 from core.config import settings
 from core.database import Base, engine, get_db
 from core.db_log_handler import DatabaseLogHandler
+from core.logging.formatters import ConsoleJSONFormatter
 from core.logging.handlers import setup_log_handlers
 from core.logging.middleware import AccessLogMiddleware
 from core.request_id_middleware import RequestIDMiddleware
@@ -38,45 +37,12 @@
 from modules.objects.routes import router as object_router
 from modules.profile.routes import router as profile_router
 
-# ===================================
-# JSON Logging for Production
-# ===================================
-
-
-class JsonFormatter(logging.Formatter):
-    """Кастомный форматтер для структурированного JSON-логирования с Moscow timezone"""
-
-    def format(self, record):
-        # ✅ Конвертируем время в Moscow timezone
-        moscow_tz = pytz.timezone("Europe/Moscow")
-        dt = datetime.fromtimestamp(record.created, tz=pytz.utc)
-        moscow_time = dt.astimezone(moscow_tz)
-
-        log_data = {
-            "time": moscow_time.strftime("%Y-%m-%d %H:%M:%S"),  # ✅ Moscow time
-            "level": record.levelname,
-            "logger": record.name,
-        }
-
-        # Если message — словарь, мержим его в корень
-        if isinstance(record.msg, dict):
-            log_data.update(record.msg)
-        else:
-            log_data["message"] = record.getMessage()
-
-        # Добабляем exception, если есть
-        if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
-
-        return json.dumps(log_data, ensure_ascii=False)
-
-
 LOGGING_CONFIG = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
         "json": {
-            "()": JsonFormatter,
+            "()": ConsoleJSONFormatter,
             "datefmt": "%Y-%m-%dT%H:%M:%S",
         },
     },
@@ -91,6 +57,13 @@ def format(self, record):
             "formatter": "json",
             "stream": "ext://sys.stdout",
         },
+        # Запись в stdout и JSON-сериализация — в потоке QueueListener,
+        # а не в потоке, который вызвал logger.info / logger.warning
+        "default_queue": {
+            "class": "core.logging.handlers.InProcessQueueHandler",
+            "handlers": ["default"],
+            "respect_handler_level": True,
+        },
         "database": {
             "()": DatabaseLogHandler,
             "level": "INFO",
@@ -108,22 +81,22 @@ def format(self, record):
             "propagate": False,
         },
         "app": {
-            "handlers": ["default", "database"],
+            "handlers": ["default_queue", "database"],
             "level": "DEBUG" if settings.DEBUG else "INFO",
             "propagate": True,
         },
         "audit": {
-            "handlers": ["default", "database"],
+            "handlers": ["default_queue", "database"],
             "level": "INFO",
             "propagate": True,
         },
         "system": {
-            "handlers": ["default", "database"],
+            "handlers": ["default_queue", "database"],
             "level": "INFO",
             "propagate": True,
         },
         "security": {
-            "handlers": ["default", "database"],
+            "handlers": ["default_queue", "database"],
             "level": "WARNING",
             "propagate": True,
         },
@@ -133,6 +106,10 @@ def format(self, record):
 logging.config.dictConfig(LOGGING_CONFIG)
 logger = logging.getLogger("app")
 
+console_listener = logging.getHandlerByName("default_queue").listener
+console_listener.start()
+atexit.register(console_listener.stop)
+
 # ===================================
 # Подключаем кастомные файловые хендлеры
 # ===================================
@@ -166,6 +143,11 @@ async def lifespan(app: FastAPI):
             await init_login_tracker(redis_client)
             logger.debug("Login attempt tracker initialized")
 
+            # Фоновый замер CPU для детального health check
+            from core.monitoring.health import start_cpu_sampler
+
+            start_cpu_sampler()
+
             # Initialize email notifier if configured
             if (
                 settings.SMTP_HOST
@@ -197,7 +179,22 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"Failed to initialize monitoring components: {e}")
 
+    # Фоновая пакетная запись алертов безопасности
+    from core.logging.actions import start_alert_flusher, stop_alert_flusher
+
+    start_alert_flusher()
+
     yield
+    await stop_alert_flusher()
+
+    if settings.MONITORING_ENABLED:
+        from core.monitoring.health import stop_cpu_sampler
+
+        await stop_cpu_sampler()
+
+    from core.logging.geoip_resolver import close_geo_client
+
+    await close_geo_client()
     try:
         from core.redis import close_redis
 
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, BigInteger, String, Text, DateTime, Index, Enum as SqlEnum, ForeignKey, Boolean, Integer
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from sqlalchemy.orm import relationship
 from core.database import Base
 from datetime import datetime
@@ -95,6 +95,12 @@ class AuditLog(Base):
         Index("ix_audit_logs_user_created", "user_id", "created_at"),
         Index("ix_audit_logs_request_id", "request_id"),
         Index("ix_audit_logs_expires", "expires_at", "is_archived"),
+        # Частичный индекс для cleanup_expired_logs: только неархивные записи
+        Index(
+            "ix_audit_logs_expires_active",
+            "expires_at",
+            postgresql_where=text("is_archived = false"),
+        ),
         Index("ix_audit_logs_status_created", "http_status", "created_at"),
     )
 
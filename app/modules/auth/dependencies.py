@@ -125,7 +125,9 @@ def _load_user_snapshot(db: Session, user_id: int) -> User | None:
 # Зависимость для получения текущего пользователя из JWT (API)
 # ===================================
 def get_current_user(
-    credentials=Depends(security), db: Session = Depends(get_db)
+    request: Request,
+    credentials=Depends(security),
+    db: Session = Depends(get_db),
 ) -> User:
     """
     Получить текущего пользователя из JWT токена (для API endpoints).
@@ -137,6 +139,8 @@ def get_current_user(
 
     try:
         payload = decode_token(token)
+        # AccessLogMiddleware берёт user_id/email отсюда, не декодируя токен повторно
+        request.state.jwt_claims = payload
         user_id: str = payload.get("sub")
 
         if user_id is None:
@@ -208,6 +212,7 @@ def get_current_user_from_cookie(
     try:
         # Декодируем JWT
         payload = decode_token(token)
+        request.state.jwt_claims = payload
         user_id: str = payload.get("sub")
 
         if user_id is None:
@@ -281,6 +286,7 @@ def get_current_user_optional(
 
     try:
         payload = decode_token(token)
+        request.state.jwt_claims = payload
         user_id: str = payload.get("sub")
 
         if user_id is None:
@@ -73,8 +73,9 @@ def register_page(request: Request):
 def get_client_ip(request: Request) -> str:
     """Получить IP адрес клиента"""
     # Проверяем X-Forwarded-For заголовок (для прокси/load balancer)
-    if request.headers.get("x-forwarded-for"):
-        return request.headers["x-forwarded-for"].split(",")[0].strip()
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if forwarded_for:
+        return forwarded_for.split(",", 1)[0].strip()
     # Иначе берём IP из подключения
     return request.client.host if request.client else "unknown"
 
@@ -7,7 +7,7 @@
 from fastapi import HTTPException, status
 from modules.monitoring.service_alerts import AlertService
 from modules.monitoring.models import AlertSeverity, AlertType
-from core.config import settings, OTP_EXPIRATION_DELTA
+from core.config import settings, otp_expiration_delta
 from core.redis import redis_client
 from core.constants import UserRole  # ✅ импорт из constants
 from modules.auth.models import User, Session as SessionModel, OTP, OTPPurpose
@@ -388,7 +388,7 @@ def request_otp(data: OTPRequest, db: Session) -> dict:
         # Генерируем OTP
         code = generate_otp()
         code_hash = hash_otp(code)
-        expires_at = datetime.now(timezone.utc) + OTP_EXPIRATION_DELTA
+        expires_at = datetime.now(timezone.utc) + otp_expiration_delta()
 
         otp = OTP(
             user_id=user.id,
@@ -536,7 +536,7 @@ def password_reset_request(data: PasswordResetRequest, db: Session) -> dict:
         # Генерируем OTP
         code = generate_otp()
         code_hash = hash_otp(code)
-        expires_at = datetime.now(timezone.utc) + OTP_EXPIRATION_DELTA
+        expires_at = datetime.now(timezone.utc) + otp_expiration_delta()
 
         otp = OTP(
             user_id=user.id,
@@ -4,7 +4,7 @@
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from core.config import settings, JWT_EXPIRATION_DELTA, REFRESH_TOKEN_EXPIRATION_DELTA
+from core.config import settings, jwt_expiration_delta, refresh_token_expiration_delta
 
 # ===================================
 # Контекст для хэширования паролей
@@ -36,7 +36,7 @@ def create_access_token(user_id: int, role: str) -> tuple[str, datetime]:
         tuple[str, datetime]: (token, expiration_time)
     """
     now = datetime.now(timezone.utc)
-    expires_at = now + JWT_EXPIRATION_DELTA
+    expires_at = now + jwt_expiration_delta()
     
     payload = {
         "sub": str(user_id),
@@ -62,7 +62,7 @@ def create_refresh_token() -> tuple[str, str, datetime]:
         tuple[str, str, datetime]: (token, token_hash, expiration_time)
     """
     now = datetime.now(timezone.utc)
-    expires_at = now + REFRESH_TOKEN_EXPIRATION_DELTA
+    expires_at = now + refresh_token_expiration_delta()
     
     # Генерируем случайный токен
     token = secrets.token_urlsafe(64)
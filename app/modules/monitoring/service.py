@@ -2,12 +2,12 @@
 Service layer for monitoring functionality (SQL-only version)
 """
 
-import json
 import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pathlib import Path
 
+import orjson
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -126,14 +126,17 @@ def get_recent_logs(
             with open(log_path, "r") as f:
                 lines = f.readlines()[-1000:]
 
+            search_lower = search.lower() if search else None
+
             for line in reversed(lines):
                 try:
-                    log_data = json.loads(line.strip())
-
-                    if level and log_data.get("level") != level:
+                    # Поиск — по исходной строке JSON, без повторной сериализации
+                    if search_lower and search_lower not in line.lower():
                         continue
 
-                    if search and search.lower() not in json.dumps(log_data).lower():
+                    log_data = orjson.loads(line)
+
+                    if level and log_data.get("level") != level:
                         continue
 
                     log_entry = LogEntry(
@@ -0,0 +1,28 @@
+"""
+Tests for the in-memory alert manager
+"""
+from datetime import timezone
+
+import pytest
+
+from core.monitoring.alerts import AlertManager, AlertSeverity, AlertType
+
+
+@pytest.mark.asyncio
+async def test_resolve_alert_stores_epoch_and_aware_datetime():
+    manager = AlertManager()
+    alert = await manager.create_alert(
+        severity=AlertSeverity.HIGH,
+        alert_type=AlertType.BRUTE_FORCE_ATTEMPT,
+        message="test",
+        user_id=None,
+        ip_address="10.0.0.1",
+        details={},
+    )
+    assert alert.resolved_at_dt is None
+
+    assert await manager.resolve_alert(alert.id, resolved_by=1)
+
+    assert isinstance(alert.resolved_at, float)
+    assert alert.resolved_at >= alert.timestamp
+    assert alert.resolved_at_dt.tzinfo is timezone.utc
@@ -0,0 +1,58 @@
+"""
+Tests for the audit log writer
+"""
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+
+from core import audit
+from core.audit import AuditEntry
+
+
+@pytest.fixture
+def audit_file(tmp_path, monkeypatch):
+    path = tmp_path / "audit.log"
+    audit.close_audit_log()
+    monkeypatch.setattr(audit, "AUDIT_LOG_FILE", path)
+    yield path
+    audit.close_audit_log()
+
+
+def _entry(action: str, changes=None) -> AuditEntry:
+    return AuditEntry(
+        timestamp=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        user_id=1,
+        action=action,
+        table_name="users",
+        record_id=7,
+        ip_address="10.0.0.1",
+        changes=changes,
+        additional_info=None,
+    )
+
+
+def test_bad_entry_does_not_drop_batch(audit_file):
+    audit._write_entries([
+        _entry("create", {"name": "a"}),
+        _entry("update", {"big": 2 ** 70}),
+        _entry("delete", {1: "int key"}),
+    ])
+
+    lines = [orjson.loads(line) for line in audit_file.read_bytes().splitlines()]
+    assert [line["action"] for line in lines] == ["create", "delete"]
+    assert lines[0]["timestamp"] == "2026-01-01T00:00:00Z"
+    assert lines[1]["changes"] == {"1": "int key"}
+
+
+def test_missing_log_dir_uses_fallback_file(tmp_path, monkeypatch):
+    audit.close_audit_log()
+    monkeypatch.setattr(audit, "AUDIT_LOG_FILE", tmp_path / "missing" / "audit.log")
+    monkeypatch.chdir(tmp_path)
+    try:
+        audit._write_entries([_entry("create")])
+    finally:
+        audit.close_audit_log()
+
+    [line] = (tmp_path / "audit.log").read_bytes().splitlines()
+    assert orjson.loads(line)["action"] == "create"
@@ -0,0 +1,105 @@
+"""
+Tests for the queued database log handler
+"""
+import logging
+import threading
+import time
+
+import psycopg2
+
+from core.db_log_handler import DatabaseLogHandler
+
+
+def _record(event: str) -> logging.LogRecord:
+    return logging.LogRecord("app", logging.INFO, __file__, 1, {"event": event}, None, None)
+
+
+def test_full_queue_drops_oldest(monkeypatch):
+    monkeypatch.setattr(DatabaseLogHandler, "QUEUE_MAX_SIZE", 2)
+    handler = DatabaseLogHandler()
+    monkeypatch.setattr(handler, "_ensure_worker", lambda: None)
+
+    for event in ("first", "second", "third"):
+        handler.emit(_record(event))
+
+    queued = [handler._queue.get_nowait()["event"] for _ in range(handler._queue.qsize())]
+    assert queued == ["second", "third"]
+
+
+def test_dict_message_goes_to_columns_and_extra_data():
+    handler = DatabaseLogHandler()
+    record = logging.LogRecord(
+        "app", logging.WARNING, __file__, 1,
+        {"event": "login", "email": "u@example.com", "ip": "10.0.0.1", "status": 200, "attempt": 2},
+        None, None,
+    )
+
+    payload = handler._parse_record_payload(record)
+
+    assert payload["event"] == "login"
+    assert payload["user_email"] == "u@example.com"
+    assert payload["ip_address"] == "10.0.0.1"
+    assert payload["http_status"] == 200
+    assert payload["extra_data"] == {"attempt": 2}
+
+
+class _FakeSession:
+    def __init__(self):
+        self.rolled_back = False
+        self.closed = False
+
+    def execute(self, *args, **kwargs):
+        return None
+
+    def commit(self):
+        raise AssertionError("commit after a failed COPY")
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+def _row(handler, event: str) -> dict:
+    row = handler._parse_record_payload(_record(event))
+    row.update(request_id=None, level=None, expires_at=None, created_at=None)
+    return row
+
+
+def test_copy_failure_rolls_back_and_starts_cooldown(monkeypatch):
+    session = _FakeSession()
+    monkeypatch.setattr("core.db_log_handler.SessionLocal", lambda: session)
+    monkeypatch.setattr(DatabaseLogHandler, "COPY_THRESHOLD", 0)
+    handler = DatabaseLogHandler()
+
+    def failing_copy(db, batch):
+        raise psycopg2.OperationalError("COPY failed")
+
+    monkeypatch.setattr(handler, "_copy_rows", failing_copy)
+
+    handler._write_batch([_row(handler, "first")])
+
+    assert session.rolled_back and session.closed
+    assert handler._disabled_until > time.monotonic()
+
+
+def test_writer_thread_survives_unexpected_error(monkeypatch):
+    handler = DatabaseLogHandler()
+    monkeypatch.setattr(DatabaseLogHandler, "EPOCH_INTERVAL_SEC", 0)
+    written = threading.Event()
+    calls = []
+
+    def write_batch(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("unexpected")
+        written.set()
+
+    monkeypatch.setattr(handler, "_write_batch", write_batch)
+    handler._ensure_worker()
+    handler._queue.put({"event": "first"})
+    handler._queue.put({"event": "second"})
+
+    assert written.wait(timeout=2)
+    assert handler._worker.is_alive()
@@ -0,0 +1,45 @@
+"""
+Tests for AES-GCM encryption and legacy Fernet compatibility
+"""
+from core.encryption import _get_fernet, decrypt_data, encrypt_data, is_encrypted
+
+
+def test_encrypt_decrypt_round_trip():
+    token = encrypt_data("sensitive information")
+
+    assert token.startswith("v1:")
+    assert decrypt_data(token) == "sensitive information"
+
+
+def test_encrypt_uses_fresh_nonce():
+    assert encrypt_data("same") != encrypt_data("same")
+
+
+def test_decrypt_legacy_fernet_token():
+    legacy = _get_fernet().encrypt("сохранено до AES-GCM".encode()).decode()
+
+    assert decrypt_data(legacy) == "сохранено до AES-GCM"
+
+
+def test_decrypt_tampered_token_returns_none():
+    token = encrypt_data("sensitive information")
+    # Меняем символ внутри шифротекста, не трогая base64-паддинг
+    i = len("v1:") + 24
+    tampered = token[:i] + ("A" if token[i] != "A" else "B") + token[i + 1:]
+
+    assert decrypt_data(tampered) is None
+    assert decrypt_data("not a token") is None
+
+
+def test_empty_values():
+    assert encrypt_data("") is None
+    assert decrypt_data("") is None
+
+
+def test_is_encrypted():
+    assert is_encrypted(encrypt_data("x"))
+    assert is_encrypted(_get_fernet().encrypt(b"x").decode())
+    assert not is_encrypted("v1:short")
+    assert not is_encrypted("plain text value")
+    assert not is_encrypted("")
+    assert not is_encrypted(None)
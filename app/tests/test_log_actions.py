@@ -0,0 +1,44 @@
+"""
+Tests for structured log events passing through the redaction filters
+"""
+import asyncio
+import logging
+
+import pytest
+
+from core.logging import actions
+from core.logging.filters import get_logger
+
+
+class _Capture(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.mark.asyncio
+async def test_log_user_action_masks_email_and_redacts_password():
+    logger = get_logger("app")
+    capture = _Capture()
+    logger.addHandler(capture)
+    previous_level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        actions.log_user_action(
+            "profile_updated",
+            user=None,
+            request=None,
+            extra={"email": "john.doe@example.com", "password": "hunter2"},
+        )
+        await asyncio.gather(*actions._background_tasks)
+    finally:
+        logger.removeHandler(capture)
+        logger.setLevel(previous_level)
+
+    [record] = capture.records
+    assert record.msg["event"] == "profile_updated"
+    assert record.msg["email"] == "j***@example.com"
+    assert record.msg["password"] == "***REDACTED***"
@@ -0,0 +1,61 @@
+"""
+Tests for log redaction and PII masking filters
+"""
+import logging
+
+import pytest
+
+from core.logging.filters import PIIFilter, SensitiveDataFilter
+
+
+@pytest.fixture
+def redact():
+    return SensitiveDataFilter()._redact_sensitive_data
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ('Authorization: Bearer abc.def.ghi', 'Authorization: ***REDACTED***'),
+        ('authorization: bearer abc.def.ghi', 'Authorization: ***REDACTED***'),
+        ('Authorization: abc123', 'Authorization: ***REDACTED***'),
+        ('sent Bearer abc.def-ghi', 'sent Bearer ***REDACTED***'),
+        ('login password=hunter2 ok', 'login password=***REDACTED*** ok'),
+        ('{"password": "hunter2"}', '{"password": "***REDACTED***"}'),
+        ("{'token': 'abc'}", "{'token': '***REDACTED***'}"),
+        ('url?token=abc', 'url?token=***REDACTED***'),
+        ('{"api_key": "k"}', '{"api_key": "***REDACTED***"}'),
+        ('{"secret": "s"}', '{"secret": "***REDACTED***"}'),
+        ('card 1234 5678 9012 3456', 'card ****-****-****-****'),
+        ('ssn 123-45-6789', 'ssn ***-**-****'),
+        ('user logged in', 'user logged in'),
+    ],
+)
+def test_redact_sensitive_data(redact, text, expected):
+    assert redact(text) == expected
+
+
+def test_redact_dict_nested():
+    data = {
+        'user': {'password': 'x', 'note': 'token=abc'},
+        'api_key': 'k',
+        'count': 3,
+    }
+    assert SensitiveDataFilter()._redact_dict(data) == {
+        'user': {'password': '***REDACTED***', 'note': 'token=***REDACTED***'},
+        'api_key': '***REDACTED***',
+        'count': 3,
+    }
+
+
+def test_filter_redacts_message_and_args():
+    record = logging.LogRecord(
+        'test', logging.INFO, __file__, 1, 'header %s', ('Authorization: Bearer abc',), None
+    )
+    assert SensitiveDataFilter().filter(record) is True
+    assert record.getMessage() == 'header Authorization: ***REDACTED***'
+
+
+def test_pii_mask_email_and_phone():
+    masked = PIIFilter()._mask_pii('mail john.doe@example.com call 555-123-4567')
+    assert masked == 'mail j***@example.com call ***-***-4567'
@@ -0,0 +1,16 @@
+"""
+Tests for log formatters
+"""
+import logging
+
+from core.logging.formatters import DevelopmentFormatter
+
+
+def test_development_formatter_indents_dict_messages():
+    record = logging.LogRecord(
+        "app", logging.INFO, __file__, 1, {"event": "вход", 1: "int key"}, None, None
+    )
+
+    output = DevelopmentFormatter().format(record)
+
+    assert '{\n  "event": "вход",\n  "1": "int key"\n}' in output
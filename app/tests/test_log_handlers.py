@@ -0,0 +1,63 @@
+"""
+Tests for the compressing rotating file handler
+"""
+import os
+
+import zstandard
+
+from core.logging.handlers import RotatingFileHandlerWithCompression, _get_rotation_executor
+
+
+def _make_handler(tmp_path, backup_count=3):
+    return RotatingFileHandlerWithCompression(
+        str(tmp_path / "app.log"), maxBytes=1024, backupCount=backup_count, delay=True
+    )
+
+
+def test_compress_and_shift_writes_zst(tmp_path):
+    handler = _make_handler(tmp_path)
+    pending = tmp_path / "app.log.1.pending"
+    pending.write_bytes(b"line\n")
+
+    handler._compress_and_shift(str(pending))
+
+    assert not pending.exists()
+    data = (tmp_path / "app.log.1.zst").read_bytes()
+    assert zstandard.ZstdDecompressor().decompressobj().decompress(data) == b"line\n"
+
+
+def test_legacy_backups_rotate_out(tmp_path):
+    handler = _make_handler(tmp_path, backup_count=3)
+    # Прежний хендлер: .1 без сжатия, .2 и дальше — gzip без суффикса
+    for i in range(1, 4):
+        (tmp_path / f"app.log.{i}").write_bytes(b"old")
+
+    for _ in range(3):
+        pending = tmp_path / "app.log.pending"
+        pending.write_bytes(b"new")
+        handler._compress_and_shift(str(pending))
+        assert len(os.listdir(tmp_path)) == 3
+
+    assert sorted(os.listdir(tmp_path)) == ["app.log.1.zst", "app.log.2.zst", "app.log.3.zst"]
+
+
+def test_stale_pending_is_compressed_on_startup(tmp_path, monkeypatch):
+    monkeypatch.setattr("core.logging.handlers.PENDING_STALE_SECONDS", -1)
+    (tmp_path / "app.log.100.pending").write_bytes(b"older")
+    (tmp_path / "app.log.200.pending").write_bytes(b"newer")
+
+    _make_handler(tmp_path)
+    _get_rotation_executor().submit(lambda: None).result()
+
+    assert sorted(os.listdir(tmp_path)) == ["app.log.1.zst", "app.log.2.zst"]
+    decompress = zstandard.ZstdDecompressor().decompressobj
+    assert decompress().decompress((tmp_path / "app.log.1.zst").read_bytes()) == b"newer"
+
+
+def test_recent_pending_is_left_to_its_process(tmp_path):
+    (tmp_path / "app.log.100.pending").write_bytes(b"in flight")
+
+    _make_handler(tmp_path)
+    _get_rotation_executor().submit(lambda: None).result()
+
+    assert os.listdir(tmp_path) == ["app.log.100.pending"]
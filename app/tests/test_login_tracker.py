@@ -0,0 +1,101 @@
+"""
+Tests for the login tracker's IP history storage
+"""
+import orjson
+import pytest
+
+from core.monitoring.detector import LoginAttemptTracker
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def delete(self, key):
+        self._ops.append(lambda: self._redis.delete(key))
+
+    def zadd(self, key, mapping):
+        self._ops.append(lambda: self._redis.zadd(key, mapping))
+
+    def expire(self, key, ttl):
+        self._ops.append(lambda: self._redis.expire(key, ttl))
+
+    async def execute(self):
+        return [op() for op in self._ops]
+
+
+class _FakeRedis:
+    """Минимальный in-memory Redis для _migrate_user_ips"""
+
+    def __init__(self):
+        self.strings = {}
+        self.zsets = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def ttl(self, key):
+        if key not in self.strings and key not in self.zsets:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    def delete(self, key):
+        self.strings.pop(key, None)
+        self.zsets.pop(key, None)
+        self.ttls.pop(key, None)
+
+    def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+
+@pytest.mark.asyncio
+async def test_migrate_user_ips_keeps_order_and_ttl():
+    redis = _FakeRedis()
+    key = "user_ips:user@example.com"
+    redis.strings[key] = orjson.dumps(["10.0.0.1", "10.0.0.2", "10.0.0.3"])
+    redis.ttls[key] = 1234
+
+    await LoginAttemptTracker(redis)._migrate_user_ips(key)
+
+    assert key not in redis.strings
+    scores = redis.zsets[key]
+    assert sorted(scores, key=scores.get) == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+    assert redis.ttls[key] == 1234
+
+
+@pytest.mark.asyncio
+async def test_migrate_user_ips_drops_corrupt_value():
+    redis = _FakeRedis()
+    key = "user_ips:user@example.com"
+    redis.strings[key] = b"[not json"
+
+    await LoginAttemptTracker(redis)._migrate_user_ips(key)
+
+    assert key not in redis.strings
+    assert key not in redis.zsets
+
+
+@pytest.mark.asyncio
+async def test_migrate_user_ips_without_ttl():
+    redis = _FakeRedis()
+    key = "user_ips:user@example.com"
+    redis.strings[key] = orjson.dumps(["10.0.0.1"])
+
+    await LoginAttemptTracker(redis)._migrate_user_ips(key)
+
+    assert list(redis.zsets[key]) == ["10.0.0.1"]
+    assert key not in redis.ttls